@@ -0,0 +1,162 @@
+"""
+Headless benchmark suite for the geohash pipeline.
+
+Every stage the pages run is timed outside Streamlit on synthetic inputs:
+an ellipse sized to cover roughly ``n`` cells at each precision is covered,
+and its cells feed the tokenizer, decode, dissolve, export and map stages.
+
+Results are compared with a stored baseline (one median time per stage,
+size and precision); the run exits with status 1 when any stage is slower
+than ``baseline * (1 + threshold)``. Baselines are machine specific, so
+record one with ``--update-baseline`` on the machine that runs the checks.
+
+Usage::
+
+    python benchmarks/run.py                      # compare with baseline
+    python benchmarks/run.py --update-baseline    # (re)write the baseline
+    python benchmarks/run.py --sizes 1000,10000 --precisions 5,7 --threshold 0.5
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import folium  # noqa: E402
+import pandas as pd  # noqa: E402
+from shapely.geometry import Polygon  # noqa: E402
+
+from geohash_converter import (  # noqa: E402
+    cover_geometry,
+    dissolve_geohashes,
+    geohashes_to_geometry,
+    tokenize_geohashes,
+    validate_geohashes,
+)
+from geohash_converter.export import export_bytes, geojson_chunks  # noqa: E402
+from geohashlayer import GeohashLayer  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_PRECISIONS = [5, 6, 7, 8, 9]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+CENTER = (106.82713616185086, -6.175337169759785)  # lon, lat
+# Regressions smaller than this (seconds) are treated as timer noise
+MIN_DELTA = 0.005
+
+
+def synthetic_polygon(n, precision):
+    """Ellipse around Jakarta covering about ``n`` cells at ``precision``."""
+    dlon = math.ldexp(360.0, -((5 * precision + 1) // 2))
+    dlat = math.ldexp(180.0, -(5 * precision // 2))
+    r = math.sqrt(n / math.pi)
+    steps = 256
+    return Polygon([
+        (CENTER[0] + r * dlon * math.cos(2 * math.pi * k / steps),
+         CENTER[1] + r * dlat * math.sin(2 * math.pi * k / steps))
+        for k in range(steps)
+    ])
+
+
+def _timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def run_case(n, precision, repeat):
+    """Time every stage for one size/precision; returns ``{stage: seconds}``."""
+    polygon = synthetic_polygon(n, precision)
+    timings = {}
+    timings["cover"], cells = _timed(lambda: cover_geometry(polygon, precision, cache=None, disk=None), repeat)
+    cells = list(cells)
+    text = "\n".join(cells)
+    series = pd.Series(cells)
+    df = pd.DataFrame({"geohash": cells})
+
+    timings["tokenize_geohashes"], _ = _timed(lambda: tokenize_geohashes(text), repeat)
+    timings["validate_geohashes"], _ = _timed(lambda: validate_geohashes(series), repeat)
+    timings["geohashes_to_geometry"], _ = _timed(lambda: geohashes_to_geometry(df, "geohash"), repeat)
+    timings["dissolve"], _ = _timed(lambda: dissolve_geohashes(cells), repeat)
+    timings["geojson_export"], _ = _timed(lambda: export_bytes(geojson_chunks(df)), repeat)
+    timings["zip_export"], _ = _timed(
+        lambda: export_bytes(geojson_chunks(df), zip_member="geohash_polygons.geojson"), repeat
+    )
+
+    def render_map():
+        m = folium.Map(location=[CENTER[1], CENTER[0]], zoom_start=10)
+        GeohashLayer(cells, name="Geohash Cells").add_to(m)
+        return m.get_root().render()
+
+    timings["folium_html"], _ = _timed(render_map, repeat)
+    return len(cells), timings
+
+
+def _key(stage, n, precision):
+    return f"{stage}|{n}|{precision}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated target cell counts")
+    parser.add_argument("--precisions", default=",".join(map(str, DEFAULT_PRECISIONS)),
+                        help="comma separated geohash precisions")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the median is kept")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("GEOHASH_BENCH_THRESHOLD", 0.25)),
+                        help="allowed slowdown as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    precisions = [int(p) for p in args.precisions.split(",")]
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results, regressions = {}, []
+    for precision in precisions:
+        for n in sizes:
+            cells, timings = run_case(n, precision, args.repeat)
+            for stage, seconds in timings.items():
+                key = _key(stage, n, precision)
+                results[key] = seconds
+                base = baseline.get(key)
+                status = ""
+                if base is not None:
+                    ratio = seconds / base if base else float("inf")
+                    status = f"{ratio:6.2f}x"
+                    if seconds > base * (1 + args.threshold) and seconds - base > MIN_DELTA:
+                        regressions.append(key)
+                        status += "  REGRESSION"
+                print(f"p={precision} n={n:>9,} cells={cells:>9,} {stage:<30} {seconds:9.4f}s {status}")
+
+    if args.update_baseline:
+        merged = {**baseline, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"threshold": args.threshold, "results": merged}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed more than {args.threshold:.0%}:")
+        for key in regressions:
+            print(f"  {key}: {baseline[key]:.4f}s -> {results[key]:.4f}s")
+        return 1
+    if not baseline:
+        print("No baseline found; run with --update-baseline to record one.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Geohash engines shared by the Streamlit pages and the batch CLI
+(``python -m geohash_converter``).
+"""
+
+from geohash_converter.batch import cover_directory, cover_file, geohash_table
+from geohash_converter.budget import CellBudgetExceeded, estimate_cells, estimate_table
+from geohash_converter.cache import LRUCache, cover_cache, geometry_fingerprint
+from geohash_converter.compact import compact_geohashes, expand_geohashes
+from geohash_converter.cover import (
+    cover_features,
+    cover_geometry,
+    create_geohash_list,
+    polygon_to_geohashes,
+)
+from geohash_converter.decode import (
+    decode_bounds,
+    decode_indices,
+    geohashes_to_boxes,
+    geohashes_to_geometry,
+    geohashes_to_int,
+    indices_to_int,
+    int_to_geohashes,
+)
+from geohash_converter.dissolve import dissolve_geohashes
+from geohash_converter.incremental import CoverSet
+from geohash_converter.lookup import GeohashIndex, encode_points
+from geohash_converter.neighbors import boundary_ring, k_ring
+from geohash_converter.polygons import parse_polygons
+from geohash_converter.reader import iter_features, read_feature_batches
+from geohash_converter.setops import geohash_difference, geohash_intersection, geohash_union
+from geohash_converter.validate import tokenize_geohash_keys, tokenize_geohashes, validate_geohashes
+
+__all__ = [
+    "CellBudgetExceeded",
+    "CoverSet",
+    "GeohashIndex",
+    "LRUCache",
+    "boundary_ring",
+    "compact_geohashes",
+    "cover_directory",
+    "cover_cache",
+    "cover_features",
+    "cover_file",
+    "cover_geometry",
+    "create_geohash_list",
+    "decode_bounds",
+    "decode_indices",
+    "dissolve_geohashes",
+    "encode_points",
+    "estimate_cells",
+    "estimate_table",
+    "expand_geohashes",
+    "geohash_difference",
+    "geohash_intersection",
+    "geohash_table",
+    "geohash_union",
+    "geohashes_to_boxes",
+    "geohashes_to_geometry",
+    "geohashes_to_int",
+    "geometry_fingerprint",
+    "indices_to_int",
+    "int_to_geohashes",
+    "iter_features",
+    "k_ring",
+    "parse_polygons",
+    "polygon_to_geohashes",
+    "read_feature_batches",
+    "tokenize_geohash_keys",
+    "tokenize_geohashes",
+    "validate_geohashes",
+]
@@ -0,0 +1,71 @@
+"""
+Command-line batch coverage.
+
+    python -m geohash_converter INPUT_DIR PRECISION [-o OUT_DIR] [--format csv]
+
+Every GeoJSON file in ``INPUT_DIR`` is covered at ``PRECISION`` and written
+as a geohash table (one row per cell, feature attributes kept) to
+``OUT_DIR``. Files are processed in parallel and the throughput is reported
+at the end.
+"""
+
+import argparse
+import sys
+import time
+
+from geohash_converter.batch import OUTPUT_FORMATS, cover_directory
+from geohash_converter.decode import MAX_PRECISION
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m geohash_converter",
+        description="Cover every GeoJSON file in a directory with geohashes.",
+    )
+    parser.add_argument("input_dir", help="directory with GeoJSON files")
+    parser.add_argument("precision", type=int, help=f"geohash precision (1-{MAX_PRECISION})")
+    parser.add_argument("-o", "--output-dir", default="geohash_output", help="where tables are written")
+    parser.add_argument("-f", "--format", choices=list(OUTPUT_FORMATS), default="csv", help="table format")
+    parser.add_argument("--pattern", default="*.geojson", help="file name pattern (default *.geojson)")
+    parser.add_argument("--inner", action="store_true", help="keep only cells completely inside")
+    parser.add_argument("--compact", action="store_true", help="merge complete groups of 32 cells")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPUs)")
+    args = parser.parse_args(argv)
+    if not 1 <= args.precision <= MAX_PRECISION:
+        parser.error(f"precision must be between 1 and {MAX_PRECISION}")
+
+    start = time.perf_counter()
+    files = features = cells = failed = 0
+    results = cover_directory(
+        args.input_dir, args.precision, args.output_dir, fmt=args.format, inner=args.inner,
+        compact=args.compact, pattern=args.pattern, workers=args.workers,
+    )
+    # A failed file is reported and skipped; the others still run
+    for summary in results:
+        if "error" in summary:
+            failed += 1
+            print(f"{summary['input']}: error: {summary['error']}", file=sys.stderr)
+            continue
+        files += 1
+        features += summary["features"]
+        cells += summary["cells"]
+        print(
+            f"{summary['input']}: {summary['features']} feature(s), {summary['cells']} cell(s) "
+            f"in {summary['seconds']:.2f}s -> {summary['output']}"
+        )
+
+    elapsed = time.perf_counter() - start
+    if files == 0 and not failed:
+        print(f"No files matching {args.pattern!r} in {args.input_dir}", file=sys.stderr)
+        return 1
+    per_second = 1 / elapsed if elapsed else 0.0
+    print(
+        f"{files} file(s), {features} feature(s), {cells} cell(s) in {elapsed:.2f}s "
+        f"({files * per_second:.2f} files/s, {features * per_second:.1f} features/s, "
+        f"{cells * per_second:,.0f} cells/s)" + (f"; {failed} file(s) failed" if failed else "")
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Headless batch coverage.
+
+:func:`geohash_table` is the cover step the pages run, without Streamlit:
+every feature is covered (optionally compacted) and the result has one row
+per cell with the feature's attributes. :func:`cover_file` writes that table
+for one GeoJSON file and :func:`cover_directory` does so for a whole
+directory, one file per worker process. ``python -m geohash_converter`` is
+the command-line front end.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import geopandas as gpd
+import pandas as pd
+
+from geohash_converter.compact import compact_geohashes
+from geohash_converter.cover import cover_features
+from geohash_converter.export import BINARY_FORMATS, binary_export, csv_chunks, geojson_chunks, write_chunks
+from geohash_converter.reader import read_feature_batches
+
+# output format -> file extension
+OUTPUT_FORMATS = {
+    "csv": ".csv",
+    "geojson": ".geojson",
+    "parquet": BINARY_FORMATS["GeoParquet"][0],
+    "fgb": BINARY_FORMATS["FlatGeobuf"][0],
+    "arrow": BINARY_FORMATS["Arrow IPC"][0],
+}
+_BINARY_LABELS = {"parquet": "GeoParquet", "fgb": "FlatGeobuf", "arrow": "Arrow IPC"}
+
+
+def geohash_table(gdf: gpd.GeoDataFrame, precision: int, inner: bool = False, compact: bool = False,
+                  column: str = "geohash", workers=None, progress=None, max_cells=None, check=None) -> pd.DataFrame:
+    """One row per covering cell of every feature, attributes kept.
+
+    ``workers``, ``progress``, ``max_cells`` and ``check`` are passed to
+    :func:`~geohash_converter.cover.cover_features`.
+    """
+    cells = cover_features(gdf, precision, inner=inner, workers=workers, progress=progress, max_cells=max_cells,
+                           check=check)
+    if compact:
+        cells["geohash_list"] = cells["geohash_list"].apply(compact_geohashes)
+    cells = cells.explode("geohash_list").dropna(subset=["geohash_list"])
+    return cells.rename(columns={"geohash_list": column}).reset_index(drop=True)
+
+
+def write_table(table: pd.DataFrame, path: str, fmt: str = "csv", column: str = "geohash"):
+    """Write a geohash table in one of :data:`OUTPUT_FORMATS`."""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {list(OUTPUT_FORMATS)}")
+    if fmt in _BINARY_LABELS:
+        payload = binary_export(table, _BINARY_LABELS[fmt], geohash_column=column, with_int=True)
+        with open(path, "wb") as f:
+            f.write(payload)
+        return
+    chunks = csv_chunks(table, index=False) if fmt == "csv" else geojson_chunks(table, geohash_column=column)
+    with open(path, "wb") as f:
+        write_chunks(chunks, f)
+
+
+def cover_file(path: str, precision: int, out_dir: str, fmt: str = "csv", inner: bool = False,
+               compact: bool = False, workers=1) -> dict:
+    """Cover every feature of one GeoJSON file and write its geohash table.
+
+    The file is streamed in batches of features (see
+    :func:`~geohash_converter.reader.read_feature_batches`).
+
+    Returns a summary with the input and output paths, the number of
+    features and cells and the elapsed seconds.
+    """
+    start = time.perf_counter()
+    features, tables = 0, []
+    with open(path, "rb") as f:
+        for batch in read_feature_batches(f):
+            features += len(batch)
+            tables.append(geohash_table(batch, precision, inner=inner, compact=compact, workers=workers))
+    table = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=["geohash"])
+    name = os.path.splitext(os.path.basename(path))[0]
+    out_path = os.path.join(out_dir, f"{name}_geohash{precision}{OUTPUT_FORMATS[fmt]}")
+    write_table(table, out_path, fmt)
+    return {
+        "input": path,
+        "output": out_path,
+        "features": features,
+        "cells": len(table),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def cover_directory(in_dir: str, precision: int, out_dir: str, fmt: str = "csv", inner: bool = False,
+                    compact: bool = False, pattern: str = "*.geojson", workers=None):
+    """Cover every file matching ``pattern`` in ``in_dir``, in parallel.
+
+    Files are spread over a process pool (one file per task); a single file
+    has its features spread over the pool instead. Yields the
+    :func:`cover_file` summary of each file as it completes. A file that
+    fails does not stop the others: its summary is ``{"input": path,
+    "error": message}`` instead.
+    """
+    paths = sorted(glob.glob(os.path.join(in_dir, pattern)))
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                yield cover_file(path, precision, out_dir, fmt, inner, compact, workers=workers)
+            except Exception as e:
+                yield {"input": path, "error": str(e)}
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = {
+            pool.submit(cover_file, path, precision, out_dir, fmt, inner, compact, 1): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {"input": futures[future], "error": str(e)}
@@ -0,0 +1,104 @@
+"""
+Cell-count estimates and the cover budget.
+
+A cover's size grows 32-fold per precision level, so a fine precision over
+a large area can run for hours and exhaust the memory of the whole server.
+:func:`estimate_table` predicts the number of cells per precision from each
+shape's area, the grid lines its outline crosses and its bounding box,
+cheaply enough to show before anything is covered. :func:`cell_limit` is
+the hard budget, ``GEOHASH_MAX_CELLS`` (default 5,000,000); covers given
+``max_cells`` raise :class:`CellBudgetExceeded` as soon as they are known
+to pass it.
+
+Estimates use plain longitude/latitude degrees, like the cover itself, and
+are typically within a few percent for polygons spanning many cells.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from geohash_converter.decode import MAX_PRECISION
+
+MAX_CELLS_ENV = "GEOHASH_MAX_CELLS"
+DEFAULT_MAX_CELLS = 5_000_000
+
+_POLYGONAL = (shapely.GeometryType.POLYGON, shapely.GeometryType.MULTIPOLYGON)
+
+
+class CellBudgetExceeded(ValueError):
+    """Raised when a cover needs more cells than its budget."""
+
+    def __init__(self, cells, limit, precision):
+        self.cells = cells
+        self.limit = limit
+        self.precision = precision
+        super().__init__(
+            f"Cover at precision {precision} needs at least {cells:,} cells, more than the limit of {limit:,}"
+        )
+
+
+def cell_limit() -> int:
+    """The hard cell budget from ``GEOHASH_MAX_CELLS``."""
+    return int(float(os.environ.get(MAX_CELLS_ENV, DEFAULT_MAX_CELLS)))
+
+
+def cell_size(precision: int):
+    """``(width, height)`` of a cell in degrees."""
+    bits = 5 * precision
+    return 360.0 / 2 ** ((bits + 1) // 2), 180.0 / 2 ** (bits // 2)
+
+
+def _measures(geometries):
+    """Area, summed |dx| and |dy| of the outlines, and bounds of every shape."""
+    geometries = np.asarray(geometries, dtype=object).reshape(-1)
+    polygonal = np.isin(shapely.get_type_id(geometries), _POLYGONAL)
+    outlines = np.where(polygonal, shapely.boundary(geometries), geometries)
+    parts, owner = shapely.get_parts(outlines, return_index=True)
+    coords, part = shapely.get_coordinates(parts, return_index=True)
+    same = part[1:] == part[:-1]
+    step = np.abs(np.diff(coords, axis=0))[same]
+    line_owner = owner[part[1:][same]]
+    n = len(geometries)
+    return {
+        "polygonal": polygonal,
+        "area": shapely.area(geometries),
+        "dx": np.bincount(line_owner, weights=step[:, 0], minlength=n),
+        "dy": np.bincount(line_owner, weights=step[:, 1], minlength=n),
+        "bounds": shapely.bounds(geometries),
+    }
+
+
+def _estimate(measures, precision, inner):
+    width, height = cell_size(precision)
+    crossings = measures["dx"] / width + measures["dy"] / height
+    interior = measures["area"] / (width * height)
+    # Cells cut by the outline are half inside on average
+    if inner:
+        cells = np.maximum(interior - crossings / 2, 0.0)
+    else:
+        cells = np.where(measures["polygonal"], interior + crossings / 2 + 1, crossings + 1)
+    minx, miny, maxx, maxy = measures["bounds"].T
+    in_bbox = (np.floor(maxx / width) - np.floor(minx / width) + 1) * (np.floor(maxy / height) - np.floor(miny / height) + 1)
+    return np.nan_to_num(np.minimum(cells, in_bbox))
+
+
+def estimate_cells(geometries, precision: int, inner: bool = False) -> int:
+    """Predicted number of cells covering all ``geometries`` (summed per shape)."""
+    return int(round(_estimate(_measures(geometries), precision, inner).sum()))
+
+
+def estimate_table(geometries, inner: bool = False) -> pd.DataFrame:
+    """Predicted ``cells`` for every precision from 1 to 12."""
+    measures = _measures(geometries)
+    precision = np.arange(1, MAX_PRECISION + 1)
+    cells = [int(round(_estimate(measures, p, inner).sum())) for p in precision]
+    return pd.DataFrame({"precision": precision, "cells": cells})
+
+
+def suggest_precision(table: pd.DataFrame, limit: int):
+    """Finest precision of an :func:`estimate_table` within ``limit``, or ``None``."""
+    fits = table.loc[table["cells"] <= limit, "precision"]
+    return int(fits.max()) if len(fits) else None
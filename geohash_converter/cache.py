@@ -0,0 +1,197 @@
+"""
+Caches for cover, decode and export results.
+
+Covers are keyed on a SHA-1 of the geometry's WKB together with the
+precision and the ``inner`` flag, so any page that covers the same shape
+with the same settings gets the stored result back. The in-memory LRU
+cache lives at module level and is therefore shared by every session of
+the Streamlit server.
+
+An optional SQLite-backed disk cache sits behind it and survives server
+restarts. It is enabled by pointing ``GEOHASH_CACHE_DIR`` at a writable
+directory; ``GEOHASH_CACHE_MAX_MB`` caps its size (default 512).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import shapely
+
+# Bump when the stored representation or the cover semantics change; rows
+# written under another version are never read and get purged on open.
+CACHE_VERSION = 1
+
+
+def geometry_fingerprint(geometry) -> str:
+    """Stable hex digest of a geometry's WKB."""
+    return hashlib.sha1(shapely.to_wkb(geometry)).hexdigest()
+
+
+def cover_key(geometry, precision: int, inner: bool) -> tuple:
+    return (geometry_fingerprint(geometry), int(precision), bool(inner))
+
+
+def dumps_cells(cells) -> bytes:
+    return "\n".join(cells).encode("ascii")
+
+
+def loads_cells(raw: bytes) -> tuple:
+    return tuple(raw.decode("ascii").split("\n")) if raw else ()
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used mapping.
+
+    Parameters
+    ----------
+    maxsize : int
+        Number of entries kept before the least recently used one is evicted.
+    max_entry_size : int, optional
+        Values whose ``len()`` exceeds this are returned to the caller but not
+        stored, so a single huge cover cannot pin the whole memory budget.
+    """
+
+    def __init__(self, maxsize=128, max_entry_size=None):
+        self.maxsize = maxsize
+        self.max_entry_size = max_entry_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_entry_size is not None and len(value) > self.max_entry_size:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+class DiskCache:
+    """
+    Size-capped SQLite key/value store with least-recently-used eviction.
+
+    Values are raw ``bytes``; they are zlib-compressed on disk. Every key is
+    prefixed with :data:`CACHE_VERSION`.
+
+    Parameters
+    ----------
+    path : str
+        SQLite database file; its directory is created if missing.
+    max_bytes : int
+        Upper bound on the summed size of stored (compressed) values.
+    """
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, version INTEGER, value BLOB,"
+                " size INTEGER, last_access REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_access)")
+            self._conn.execute("DELETE FROM entries WHERE version != ?", (CACHE_VERSION,))
+
+    @classmethod
+    def from_env(cls):
+        """Build the cache from ``GEOHASH_CACHE_DIR``; ``None`` when unset."""
+        directory = os.environ.get("GEOHASH_CACHE_DIR")
+        if not directory:
+            return None
+        max_mb = float(os.environ.get("GEOHASH_CACHE_MAX_MB", 512))
+        return cls(os.path.join(directory, "geohash_cache.sqlite"), int(max_mb * 1024 * 1024))
+
+    @staticmethod
+    def _key(namespace, key):
+        return f"v{CACHE_VERSION}:{namespace}:{key}"
+
+    def get(self, namespace, key):
+        k = self._key(namespace, key)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (k,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), k))
+        return zlib.decompress(row[0])
+
+    def put(self, namespace, key, value: bytes):
+        blob = zlib.compress(value, 6)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (self._key(namespace, key), CACHE_VERSION, blob, len(blob), time.time()),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            while total > self.max_bytes:
+                key_, size = self._conn.execute(
+                    "SELECT key, size FROM entries ORDER BY last_access LIMIT 1"
+                ).fetchone()
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key_,))
+                total -= size
+
+    def get_or_compute(self, namespace, key, compute, dumps, loads):
+        """Return ``loads(stored)`` or compute, store ``dumps(value)`` and return it."""
+        raw = self.get(namespace, key)
+        if raw is not None:
+            return loads(raw)
+        value = compute()
+        self.put(namespace, key, dumps(value))
+        return value
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+
+# Shared by all pages; 5M cells is roughly a few hundred MB of strings.
+cover_cache = LRUCache(maxsize=256, max_entry_size=5_000_000)
+disk_cache = DiskCache.from_env()
+# Finished download payloads and dissolved outlines, keyed on the cell set (job
+# id or input text) and the export options, so a rerun serves the stored value
+# instead of rebuilding it.
+export_cache = LRUCache(maxsize=16, max_entry_size=256 * 1024 * 1024)
@@ -0,0 +1,88 @@
+"""
+Mixed-precision compaction of geohash sets.
+
+A geohash whose 32 children are all present covers exactly the same area
+as those children, so :func:`compact_geohashes` replaces every complete
+group by its parent, level by level from the finest precision up.
+:func:`expand_geohashes` is the inverse and brings a compacted set back to
+a single precision.
+"""
+
+import numpy as np
+
+from geohash_converter.budget import CellBudgetExceeded
+from geohash_converter.decode import BASE32, MAX_PRECISION
+
+_CHARS = np.array(list(BASE32))
+
+
+def _prefix(cells, length):
+    # Casting to a shorter unicode width truncates every string at once
+    return cells.astype(f"U{length}")
+
+
+def compact_geohashes(geohashes) -> list:
+    """Replace every complete set of 32 sibling cells by their parent.
+
+    Works on any mix of precisions; cells already covered by a coarser cell
+    in the input are dropped as well. Returns a sorted list.
+    """
+    cells = np.unique(np.asarray(list(geohashes), dtype=str))
+    if cells.size == 0:
+        return []
+    lengths = np.char.str_len(cells)
+    levels = {n: cells[lengths == n] for n in range(1, int(lengths.max()) + 1)}
+
+    for n in range(int(lengths.max()), 1, -1):
+        parents = _prefix(levels[n], n - 1)
+        uniq, counts = np.unique(parents, return_counts=True)
+        full = uniq[counts == len(BASE32)]
+        if full.size:
+            levels[n] = levels[n][~np.isin(parents, full)]
+            levels[n - 1] = np.union1d(levels[n - 1], full)
+
+    out = []
+    for n, level_cells in levels.items():
+        covered = np.zeros(level_cells.size, dtype=bool)
+        for k in range(1, n):
+            if levels[k].size:
+                covered |= np.isin(_prefix(level_cells, k), levels[k])
+        out.append(level_cells[~covered])
+    return sorted(np.concatenate(out).tolist())
+
+
+def expand_geohashes(geohashes, precision: int, max_cells=None) -> list:
+    """Expand every cell to all of its descendants at ``precision``.
+
+    Raises ``ValueError`` if a cell is already finer than ``precision``, and
+    :class:`~geohash_converter.budget.CellBudgetExceeded` before expanding
+    anything when the ``32**(precision - len)`` descendants of the cells add
+    up to more than ``max_cells``. Returns a sorted list without duplicates.
+    """
+    if not 1 <= precision <= MAX_PRECISION:
+        raise ValueError(f"precision must be between 1 and {MAX_PRECISION}, got {precision}")
+    cells = np.unique(np.asarray(list(geohashes), dtype=str))
+    if cells.size == 0:
+        return []
+    lengths = np.char.str_len(cells)
+    if (lengths > precision).any():
+        finer = cells[lengths > precision][0]
+        raise ValueError(f"Geohash {finer!s} is finer than precision {precision}")
+    if max_cells is not None:
+        # Cells inside a coarser input cell add no descendants of their own
+        nested = np.zeros(cells.size, dtype=bool)
+        for n in np.unique(lengths)[:-1]:
+            nested |= (lengths > n) & np.isin(_prefix(cells, n), cells[lengths == n])
+        # Python ints: 32**11 coarse cells would overflow int64 when summed
+        top, count = np.unique(lengths[~nested], return_counts=True)
+        expected = sum(int(c) * 32 ** (precision - int(n)) for n, c in zip(top, count))
+        if expected > max_cells:
+            raise CellBudgetExceeded(expected, max_cells, precision)
+
+    out = [cells[lengths == precision]]
+    frontier = np.array([], dtype=str)
+    for n in range(int(lengths.min()), precision):
+        frontier = np.concatenate([frontier, cells[lengths == n]])
+        frontier = np.char.add(np.repeat(frontier, len(BASE32)), np.tile(_CHARS, frontier.size))
+    out.append(frontier)
+    return np.unique(np.concatenate(out)).tolist()
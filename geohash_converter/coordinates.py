@@ -0,0 +1,134 @@
+"""
+Vectorized "lat,lon" coordinate strings per feature part and ring.
+
+:func:`coordinate_table` flattens every geometry into its coordinate
+sequences (polygon rings, line strings, points) with ``shapely`` in bulk.
+All vertices are then written as one comma-joined text: with a fixed number
+of decimals the digits are scattered straight into a byte buffer at
+precomputed offsets, otherwise NumPy's shortest float repr is used. Each
+sequence is finally sliced out of that text by character offset, so no
+Python code runs per vertex.
+"""
+
+import numpy as np
+import pandas as pd
+import shapely
+
+_POLYGON = shapely.GeometryType.POLYGON
+_ZERO, _DOT, _COMMA, _MINUS = (ord(c) for c in "0.,-")
+MAX_FAST_DECIMALS = 9
+
+
+def _scaled(values, decimals):
+    """``abs(values)`` rounded to ``decimals`` decimals, as int64 digits.
+
+    Matches ``format(v, f".{decimals}f")`` exactly: the product with
+    ``10**decimals`` is rounded once more, so values within a few ulps of a
+    half are redone with ``format``. ``None`` when the digits do not fit
+    (more than ``MAX_FAST_DECIMALS`` decimals, or huge values).
+    """
+    if decimals > MAX_FAST_DECIMALS:
+        return None
+    with np.errstate(over="ignore", invalid="ignore"):
+        product = np.abs(values) * 10.0 ** decimals
+    if not (product < 2.0 ** 52).all():
+        return None
+    scaled = np.round(product).astype(np.int64)
+    near_half = np.abs(product - np.floor(product) - 0.5) <= 8 * np.spacing(product)
+    for i in np.flatnonzero(near_half).tolist():
+        scaled[i] = int(format(abs(values[i]), f".{decimals}f").replace(".", ""))
+    return scaled
+
+
+def join_coordinates(values, decimals=None):
+    """Join floats with commas; returns ``(text, starts, ends)``.
+
+    ``text[starts[i]:ends[i]]`` is the i-th value, formatted like
+    ``format(v, f".{decimals}f")``, or as the shortest repr when ``None``.
+    Up to ``MAX_FAST_DECIMALS`` decimals the digits are computed in bulk;
+    beyond that a float64 product cannot hold them and ``format`` is used.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return "", np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    if decimals is None:
+        tokens = values.astype(str)
+        lengths = np.char.str_len(tokens).astype(np.int64)
+        starts = np.cumsum(lengths + 1) - lengths - 1
+        return ",".join(tokens.tolist()), starts, starts + lengths
+
+    scaled = _scaled(values, decimals)
+    if scaled is None:
+        tokens = np.array([format(v, f".{decimals}f") for v in values.tolist()])
+        lengths = np.char.str_len(tokens).astype(np.int64)
+        starts = np.cumsum(lengths + 1) - lengths - 1
+        return ",".join(tokens.tolist()), starts, starts + lengths
+    whole, frac = np.divmod(scaled, 10 ** decimals)
+    # Like format(): a negative value rounding to zero keeps its sign
+    negative = np.signbit(values)
+    digits = np.ones(values.size, dtype=np.int64)
+    while (whole >= 10 ** digits).any():
+        digits += whole >= 10 ** digits
+    lengths = negative + digits + (decimals + 1 if decimals else 0)
+    starts = np.cumsum(lengths + 1) - lengths - 1
+    buf = np.full(int(starts[-1] + lengths[-1]), _COMMA, dtype=np.uint8)
+
+    buf[starts[negative]] = _MINUS
+    at = starts + negative
+    for j in range(int(digits.max())):
+        has = digits > j
+        power = 10 ** (digits[has] - 1 - j)
+        buf[at[has] + j] = _ZERO + whole[has] // power % 10
+    if decimals:
+        at = at + digits
+        buf[at] = _DOT
+        for j in range(decimals):
+            buf[at + 1 + j] = _ZERO + frac // 10 ** (decimals - 1 - j) % 10
+    return buf.tobytes().decode("ascii"), starts, starts + lengths
+
+
+def _sequences(geometries):
+    """Coordinate sequences of every geometry with feature/part/ring numbers."""
+    parts, feature = shapely.get_parts(geometries, return_index=True)
+    part = np.arange(len(parts)) - np.searchsorted(feature, feature)
+
+    polygon = shapely.get_type_id(parts) == _POLYGON
+    rings, ring_of = shapely.get_rings(parts[polygon], return_index=True)
+    ring_part = np.flatnonzero(polygon)[ring_of]
+    ring = np.arange(len(rings)) - np.searchsorted(ring_of, ring_of)
+
+    # Lines and points are one sequence each; keep everything in part order
+    other = np.flatnonzero(~polygon)
+    sequence_part = np.concatenate((ring_part, other))
+    order = np.argsort(sequence_part, kind="stable")
+    sequences = np.concatenate((rings, parts[other]))[order]
+    sequence_part = sequence_part[order]
+    ring = np.concatenate((ring, np.zeros(len(other), dtype=np.int64)))[order]
+    return sequences, feature[sequence_part], part[sequence_part], ring
+
+
+def coordinate_table(gdf, name_column=None, decimals=None, start=0) -> pd.DataFrame:
+    """One row per coordinate sequence with its ``"lat,lon,lat,lon,..."`` string.
+
+    Columns are ``feature`` (row number, offset by ``start``), the optional
+    ``name_column``, ``part`` (member of a multi-geometry), ``ring`` (0 for
+    the exterior, then holes) and ``coordinates``. Empty geometries are
+    skipped.
+    """
+    sequences, feature, part, ring = _sequences(np.asarray(gdf.geometry.values, dtype=object))
+    counts = shapely.get_num_coordinates(sequences)
+    keep = counts > 0
+    sequences, feature, part, ring, counts = sequences[keep], feature[keep], part[keep], ring[keep], counts[keep]
+
+    # Latitude first: y0, x0, y1, x1, ...
+    text, starts, ends = join_coordinates(shapely.get_coordinates(sequences)[:, ::-1].ravel(), decimals)
+    last = 2 * np.cumsum(counts) - 1
+    first = last - 2 * counts + 1
+
+    table = {"feature": feature + start}
+    if name_column is not None:
+        table[name_column] = gdf[name_column].to_numpy()[feature]
+    table["part"] = part
+    table["ring"] = ring
+    table["coordinates"] = [text[a:b] for a, b in zip(starts[first].tolist(), ends[last].tolist())]
+    return pd.DataFrame(table)
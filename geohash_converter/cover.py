@@ -0,0 +1,299 @@
+"""
+Hierarchical polygon-to-geohash cover.
+
+Instead of flood-filling neighbours at the target precision, the cover
+starts from the level-1 cells touching the polygon's bounding box and
+refines level by level. Each candidate level is tested in one vectorized
+call against the prepared polygon:
+
+- cells disjoint from the polygon are dropped with all their descendants,
+- cells fully inside are accepted whole; their children are generated
+  without further testing,
+- only cells on the boundary are split and tested again.
+
+The result is identical to ``polygon_geohasher.polygon_to_geohashes`` (used
+by ``polygeohasher.create_geohash_list``) for both ``inner`` modes.
+
+Given ``max_cells``, the cover stops with
+:class:`~geohash_converter.budget.CellBudgetExceeded` at the first level
+where the accepted cells already imply more than that many results. A
+``check`` callable is polled between chunks of cells so a caller can
+abort a long cover midway (see :mod:`geohash_converter.jobs`).
+"""
+
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from fractions import Fraction
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+from geohash_converter.budget import CellBudgetExceeded
+from geohash_converter.cache import cover_cache, cover_key, disk_cache, dumps_cells, loads_cells
+from geohash_converter.decode import BASE32, MAX_PRECISION, decode_bounds
+
+# Cells tested between two calls of a cover's ``check`` hook
+CHECK_CHUNK = 20_000
+# Seconds between two calls of ``check`` while waiting on worker processes
+CHECK_INTERVAL = 0.2
+
+
+def _split(cells):
+    return [c + ch for c in cells for ch in BASE32]
+
+
+def _bbox_filter(cells, bounds, inner):
+    """Keep cells passing the same bounding-box test as the flood fill."""
+    if not cells:
+        return cells, None
+    minx_b, miny_b, maxx_b, maxy_b = bounds
+    minx, miny, maxx, maxy = decode_bounds(cells)
+    if inner:
+        keep = (minx >= minx_b) & (miny >= miny_b) & (maxx <= maxx_b) & (maxy <= maxy_b)
+    else:
+        keep = (maxx >= minx_b) & (maxy >= miny_b) & (minx <= maxx_b) & (miny <= maxy_b)
+    cells = [c for c, k in zip(cells, keep) if k]
+    boxes = shapely.box(minx[keep], miny[keep], maxx[keep], maxy[keep])
+    return cells, boxes
+
+
+def _cell_index(value, low, span, bits):
+    # Exact floor((value - low) / span * 2**bits), matching geohash.encode
+    # for points that fall exactly on a cell edge.
+    return math.floor((Fraction(value) - low) * (1 << bits) / span)
+
+
+def _centroid_cell_bounds(polygon, precision):
+    """Bounds of the cell the flood fill would start from."""
+    centroid = polygon.centroid
+    lat, lon = centroid.y, centroid.x
+    while lon >= 180.0:
+        lon -= 360.0
+    while lon < -180.0:
+        lon += 360.0
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    lat_i = min(_cell_index(lat, -90, 180, lat_bits), (1 << lat_bits) - 1)
+    lon_i = _cell_index(lon, -180, 360, lon_bits)
+    dlat = math.ldexp(180.0, -lat_bits)
+    dlon = math.ldexp(360.0, -lon_bits)
+    miny = -90.0 + lat_i * dlat
+    minx = -180.0 + lon_i * dlon
+    return minx, miny, minx + dlon, miny + dlat
+
+
+def _test_cells(polygon, cells, bounds, inner, last):
+    """``(inside, boundary)`` cells of one level; the last level has no inside."""
+    cells, boxes = _bbox_filter(cells, bounds, inner and last)
+    if not cells:
+        return [], []
+    if last:
+        hit = (shapely.contains if inner else shapely.intersects)(polygon, boxes)
+        return [], [c for c, h in zip(cells, hit) if h]
+    inside = shapely.contains(polygon, boxes)
+    touches = shapely.intersects(polygon, boxes)
+    return (
+        [c for c, i in zip(cells, inside) if i],
+        [c for c, i, t in zip(cells, inside, touches) if t and not i],
+    )
+
+
+def polygon_to_geohashes(polygon, precision: int, inner: bool = True, max_cells=None, check=None) -> set:
+    """Return the set of geohashes at ``precision`` covering ``polygon``.
+
+    With ``inner=True`` only cells completely inside the polygon are kept;
+    otherwise every cell intersecting it is. Raises
+    :class:`~geohash_converter.budget.CellBudgetExceeded` once the result is
+    known to exceed ``max_cells``. ``check()`` is called before every
+    ``CHECK_CHUNK`` cells are tested; an exception raised from it (such as
+    a job cancellation) aborts the cover.
+    """
+    if not 1 <= precision <= MAX_PRECISION:
+        raise ValueError(f"precision must be between 1 and {MAX_PRECISION}, got {precision}")
+    if polygon.is_empty:
+        return set()
+
+    bounds = polygon.bounds
+    if inner:
+        # The flood fill never leaves its starting cell when that cell is
+        # not inside the bounding box, so it returns nothing at all.
+        minx, miny, maxx, maxy = _centroid_cell_bounds(polygon, precision)
+        if minx < bounds[0] or miny < bounds[1] or maxx > bounds[2] or maxy > bounds[3]:
+            return set()
+
+    shapely.prepare(polygon)
+    full, partial = [], list(BASE32)
+    for level in range(1, precision + 1):
+        last = level == precision
+        tested = []
+        for start in range(0, len(partial), CHECK_CHUNK):
+            if check is not None:
+                check()
+            inside, tested_part = _test_cells(polygon, partial[start:start + CHECK_CHUNK], bounds, inner, last)
+            full.extend(inside)
+            tested.extend(tested_part)
+        partial = tested
+        if max_cells is not None:
+            # Accepted cells expand to 32 children per remaining level; a
+            # boundary cell keeps at least one descendant unless inner
+            at_least = len(full) * 32 ** (precision - level) + (0 if inner and not last else len(partial))
+            if at_least > max_cells:
+                raise CellBudgetExceeded(at_least, max_cells, precision)
+        if not last:
+            if check is not None:
+                check()
+            full = _split(full)
+            partial = _split(partial)
+
+    return set(full) | set(partial)
+
+
+def cover_geometry(geometry, precision: int, inner: bool = False, cache=cover_cache, disk=disk_cache,
+                   max_cells=None, check=None) -> tuple:
+    """Sorted tuple of the geohashes covering ``geometry``, memoized.
+
+    Lookups go through the in-memory ``cache`` first and then the optional
+    ``disk`` cache; pass ``None`` for either to skip it. ``max_cells`` is
+    the cell budget and ``check`` the cancellation hook (see
+    :func:`polygon_to_geohashes`); an aborted cover is not cached.
+    """
+    key = cover_key(geometry, precision, inner)
+
+    def compute():
+        cells = lambda: tuple(sorted(polygon_to_geohashes(geometry, precision, inner, max_cells, check)))
+        if disk is None:
+            return cells()
+        return disk.get_or_compute("cover", "{}:{}:{:d}".format(*key), cells, dumps_cells, loads_cells)
+
+    result = compute() if cache is None else cache.get_or_compute(key, compute)
+    if max_cells is not None and len(result) > max_cells:
+        raise CellBudgetExceeded(len(result), max_cells, precision)
+    return result
+
+
+def create_geohash_list(gdf: gpd.GeoDataFrame, geohash_level: int, inner: bool = False) -> pd.DataFrame:
+    """Drop-in replacement for ``polygeohasher.create_geohash_list``.
+
+    Adds a sorted ``geohash_list`` column for every geometry and drops the
+    geometry column, keeping all other attributes. Covers are served from
+    the shared cover cache when the same geometry was covered before.
+    """
+    gdf = gdf.copy()
+    gdf["geohash_list"] = gdf["geometry"].apply(
+        lambda x: list(cover_geometry(x, geohash_level, inner))
+    )
+    gdf = gdf.drop("geometry", axis=1)
+    return gdf
+
+
+def _cover_wkb(wkb, precision, inner, max_cells=None):
+    # Runs in worker processes; WKB keeps the pickled payload small.
+    geometry = shapely.from_wkb(wkb)
+    return tuple(sorted(polygon_to_geohashes(geometry, precision, inner, max_cells)))
+
+
+def cover_features(gdf: gpd.GeoDataFrame, geohash_level: int, inner: bool = False,
+                   workers=None, progress=None, cache=cover_cache, disk=disk_cache,
+                   max_cells=None, check=None) -> pd.DataFrame:
+    """Cover every feature separately, spreading the work over a process pool.
+
+    Same output as :func:`create_geohash_list`: one row per feature with its
+    attributes and a ``geohash_list`` column. Features already in the caches
+    are not sent to the pool. ``progress(done, total)`` is called as
+    features complete. ``workers`` defaults to the number of CPUs.
+
+    ``max_cells`` caps the summed number of cells of all features; the
+    cover raises :class:`~geohash_converter.budget.CellBudgetExceeded` and
+    cancels the queued features once it is passed.
+
+    ``check()`` is the cancellation hook of :func:`polygon_to_geohashes`.
+    In-process covers poll it between chunks of cells; with a process pool
+    it is polled while waiting for results, and an exception from it drops
+    the pool without waiting for the features still running.
+    """
+    geometries = list(gdf["geometry"])
+    total = len(geometries)
+    results = [None] * total
+    pending = []
+    for i, geometry in enumerate(geometries):
+        key = cover_key(geometry, geohash_level, inner)
+        hit = cache.get(key) if cache is not None else None
+        if hit is None and disk is not None:
+            raw = disk.get("cover", "{}:{}:{:d}".format(*key))
+            hit = loads_cells(raw) if raw is not None else None
+        if hit is None:
+            pending.append((i, key))
+        else:
+            results[i] = hit
+
+    used = sum(len(cells) for cells in results if cells is not None)
+
+    def budget():
+        # Cells still allowed for the features left to cover
+        if max_cells is None:
+            return None
+        if used > max_cells:
+            raise CellBudgetExceeded(used, max_cells, geohash_level)
+        return max_cells - used
+
+    def store(i, key, cells):
+        nonlocal used
+        used += len(cells)
+        results[i] = cells
+        if cache is not None:
+            cache.put(key, cells)
+        if disk is not None:
+            disk.put("cover", "{}:{}:{:d}".format(*key), dumps_cells(cells))
+        budget()
+
+    remaining = budget()
+
+    done = total - len(pending)
+    if progress is not None:
+        progress(done, total)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        for i, key in pending:
+            try:
+                cells = tuple(sorted(polygon_to_geohashes(geometries[i], geohash_level, inner, budget(), check)))
+            except CellBudgetExceeded as e:
+                raise CellBudgetExceeded(used + e.cells, max_cells, geohash_level) from None
+            store(i, key, cells)
+            done += 1
+            if progress is not None:
+                progress(done, total)
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(pending)))
+        futures = {
+            pool.submit(_cover_wkb, shapely.to_wkb(geometries[i]), geohash_level, inner, remaining): (i, key)
+            for i, key in pending
+        }
+        try:
+            waiting = set(futures)
+            while waiting:
+                finished, waiting = wait(waiting, timeout=CHECK_INTERVAL, return_when=FIRST_COMPLETED)
+                if check is not None:
+                    check()
+                for future in finished:
+                    i, key = futures[future]
+                    try:
+                        cells = future.result()
+                    except CellBudgetExceeded as e:
+                        raise CellBudgetExceeded(used + e.cells, max_cells, geohash_level) from None
+                    store(i, key, cells)
+                    done += 1
+                    if progress is not None:
+                        progress(done, total)
+        except BaseException:
+            # Over budget or cancelled: drop queued features and do not wait
+            # for the running ones
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+    out = gdf.copy()
+    out["geohash_list"] = [list(cells) for cells in results]
+    return out.drop("geometry", axis=1)
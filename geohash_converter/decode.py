@@ -0,0 +1,198 @@
+"""
+Vectorized geohash decoding.
+
+Every geohash in a batch is decoded in one NumPy pass: the strings are
+viewed as a fixed-width byte matrix, mapped to their 5-bit values through a
+lookup table and de-interleaved column by column into integer grid indices.
+Cell bounds are derived from those indices and the polygons are built in
+bulk with ``shapely.box``.
+"""
+
+import hashlib
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from geohash_converter.cache import disk_cache
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+MAX_PRECISION = 12
+_SIGN = np.uint64(1 << 63)
+
+# byte -> 5-bit value, 255 for characters outside the geohash alphabet
+_LUT = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(BASE32):
+    _LUT[ord(_c)] = _i
+
+
+def _as_byte_matrix(geohashes):
+    """Return ``(codes, lengths)`` for a sequence of geohash strings.
+
+    ``codes`` is an ``(n, 12)`` uint8 matrix of 5-bit values (zero padded)
+    and ``lengths`` the string length of every row.
+    """
+    text = np.asarray(geohashes, dtype=str).reshape(-1)
+    if text.dtype.itemsize > 4 * MAX_PRECISION:
+        row = int(np.flatnonzero(np.char.str_len(text) > MAX_PRECISION)[0])
+        raise ValueError(f"Invalid geohash: {str(text[row])!r}")
+    try:
+        arr = text.astype(f"S{MAX_PRECISION}")
+    except UnicodeEncodeError as e:
+        raise ValueError(f"Invalid geohash: {e.object!r}") from None
+    raw = arr.view(np.uint8).reshape(len(arr), MAX_PRECISION)
+    lengths = np.count_nonzero(raw, axis=1)
+
+    codes = _LUT[raw]
+    pad = raw == 0
+    bad = (codes == 255) & ~pad
+    if bad.any() or (lengths == 0).any():
+        row = int(np.flatnonzero(bad.any(axis=1) | (lengths == 0))[0])
+        raise ValueError(f"Invalid geohash: {str(text[row])!r}")
+    codes[pad] = 0
+    return codes, lengths
+
+
+def decode_indices(geohashes):
+    """Decode geohashes into integer grid indices.
+
+    Returns ``(lat_idx, lon_idx, lat_bits, lon_bits)`` as int64 arrays; a cell
+    spans ``180 / 2**lat_bits`` degrees of latitude starting at
+    ``-90 + lat_idx * 180 / 2**lat_bits`` (and likewise for longitude).
+    """
+    codes, lengths = _as_byte_matrix(geohashes)
+    n = len(lengths)
+    lat = np.zeros(n, dtype=np.int64)
+    lon = np.zeros(n, dtype=np.int64)
+
+    # Characters beyond a row's length are zero and contribute no bits, so
+    # walking all 12 columns and masking by length is enough.
+    bit = 0
+    for col in range(MAX_PRECISION):
+        active = lengths > col
+        if not active.any():
+            break
+        value = codes[:, col].astype(np.int64)
+        for shift in range(4, -1, -1):
+            b = (value >> shift) & 1
+            if bit % 2 == 0:
+                lon = np.where(active, (lon << 1) | b, lon)
+            else:
+                lat = np.where(active, (lat << 1) | b, lat)
+            bit += 1
+
+    total_bits = lengths.astype(np.int64) * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return lat, lon, lat_bits, lon_bits
+
+
+def geohashes_to_int(geohashes):
+    """Encode geohashes as sortable ``int64`` integers.
+
+    The 5-bit character codes are packed left-aligned into the top 60 bits
+    and the length goes into the low 4 bits; the sign bit is then flipped so
+    that signed integer order equals string order. All descendants of a cell
+    therefore fall in one contiguous range.
+    """
+    codes, lengths = _as_byte_matrix(geohashes)
+    value = np.zeros(len(lengths), dtype=np.uint64)
+    for col in range(MAX_PRECISION):
+        value = (value << np.uint64(5)) | codes[:, col].astype(np.uint64)
+    value = (value << np.uint64(4)) | lengths.astype(np.uint64)
+    return (value ^ _SIGN).view(np.int64)
+
+
+def _spread(x):
+    """Move bit ``i`` of 30-bit ``x`` (uint64) to bit ``2 * i``."""
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                        (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        x = (x | (x << np.uint64(shift))) & np.uint64(mask)
+    return x
+
+
+def _compact(x):
+    """Inverse of :func:`_spread`: gather the even bits of ``x`` (uint64) into 30 bits."""
+    x = x & np.uint64(0x5555555555555555)
+    for shift, mask in ((1, 0x3333333333333333), (2, 0x0F0F0F0F0F0F0F0F), (4, 0x00FF00FF00FF00FF),
+                        (8, 0x0000FFFF0000FFFF), (16, 0x00000000FFFFFFFF)):
+        x = (x | (x >> np.uint64(shift))) & np.uint64(mask)
+    return x
+
+
+def indices_to_int(lat, lon, precision):
+    """Inverse of :func:`decode_indices`: sortable ``int64`` keys of grid cells.
+
+    ``lat`` and ``lon`` are grid indices at ``precision`` (scalar or one per
+    cell); the keys are those of :func:`geohashes_to_int`.
+    """
+    lat = np.asarray(lat, dtype=np.int64).reshape(-1)
+    lon = np.asarray(lon, dtype=np.int64).reshape(-1)
+    total_bits = np.broadcast_to(np.asarray(precision, dtype=np.int64) * 5, lat.shape)
+    # Left-align both indices to 30 bits, then interleave longitude (odd
+    # bits) with latitude (even bits); the unused low bits stay zero
+    lon = (lon << (30 - (total_bits + 1) // 2)).astype(np.uint64)
+    lat = (lat << (30 - total_bits // 2)).astype(np.uint64)
+    value = (_spread(lon) << np.uint64(1)) | _spread(lat)
+    value = (value << np.uint64(4)) | (total_bits // 5).astype(np.uint64)
+    return (value ^ _SIGN).view(np.int64)
+
+
+def int_to_geohashes(values):
+    """Inverse of :func:`geohashes_to_int`; returns a numpy string array."""
+    values = np.asarray(values, dtype=np.int64).view(np.uint64) ^ _SIGN
+    lengths = (values & np.uint64(15)).astype(np.int64)
+    bits = values >> np.uint64(4)
+    chars = np.frombuffer(BASE32.encode("ascii"), dtype=np.uint8)
+    raw = np.zeros((len(values), MAX_PRECISION), dtype=np.uint8)
+    for col in range(MAX_PRECISION):
+        shift = np.uint64(5 * (MAX_PRECISION - 1 - col))
+        raw[:, col] = np.where(lengths > col, chars[((bits >> shift) & np.uint64(31)).astype(np.int64)], 0)
+    return raw.view(f"S{MAX_PRECISION}").reshape(-1).astype(str)
+
+
+def decode_bounds(geohashes):
+    """Decode geohashes into ``(minx, miny, maxx, maxy)`` float arrays."""
+    lat, lon, lat_bits, lon_bits = decode_indices(geohashes)
+    # Cell sizes are powers of two fractions of 180/360 degrees, so ldexp
+    # keeps the bounds bit-identical to the scalar geohash decoders.
+    dlat = np.ldexp(180.0, -lat_bits.astype(np.int32))
+    dlon = np.ldexp(360.0, -lon_bits.astype(np.int32))
+    miny = -90.0 + lat * dlat
+    minx = -180.0 + lon * dlon
+    return minx, miny, minx + dlon, miny + dlat
+
+
+def geohashes_to_boxes(geohashes):
+    """Return a ``numpy`` array of shapely polygons, one per geohash."""
+    minx, miny, maxx, maxy = decode_bounds(geohashes)
+    return shapely.box(minx, miny, maxx, maxy)
+
+
+def cached_decode_bounds(geohashes, disk=disk_cache):
+    """:func:`decode_bounds` read through the optional disk cache."""
+    if disk is None:
+        return decode_bounds(geohashes)
+    geohashes = [str(g) for g in geohashes]
+    key = hashlib.sha1("\n".join(geohashes).encode("utf-8")).hexdigest()
+    return disk.get_or_compute(
+        "decode", key,
+        lambda: decode_bounds(geohashes),
+        lambda b: np.stack(b).astype(np.float64).tobytes(),
+        lambda raw: tuple(np.frombuffer(raw, dtype=np.float64).reshape(4, -1)),
+    )
+
+
+def geohashes_to_geometry(df: pd.DataFrame, geohash_column_name: str) -> gpd.GeoDataFrame:
+    """Drop-in replacement for ``polygeohasher.geohashes_to_geometry``.
+
+    Columns holding lists of geohashes are exploded first, exactly like the
+    original, and every other column is kept. The result is in EPSG:4326.
+    """
+    df = pd.DataFrame(df).copy()
+    if len(df) and isinstance(df[geohash_column_name].iloc[0], list):
+        df = df.explode(geohash_column_name).dropna(subset=[geohash_column_name])
+    minx, miny, maxx, maxy = cached_decode_bounds(df[geohash_column_name].astype(str).to_numpy())
+    df["geometry"] = shapely.box(minx, miny, maxx, maxy)
+    return gpd.GeoDataFrame(df, geometry="geometry", crs="EPSG:4326")
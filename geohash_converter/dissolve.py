@@ -0,0 +1,83 @@
+"""
+Grid-native dissolve of geohash cells into outline polygons.
+
+Every geohash is an axis-aligned rectangle on the full-precision grid
+(``2**30`` columns by ``2**30`` rows), so the outline of a cell set needs no
+general polygon union. Each horizontal and vertical grid line is swept
+once: an edge piece is on the outline exactly when one side of it is
+covered and the other is not. The pieces are only ever joined at grid
+corners, so :func:`shapely.polygonize` turns them into faces without any
+noding, and a face is kept when a point inside it is covered by the set
+(the others are holes). The whole dissolve is a handful of sorts over the
+cell edges instead of an ``O(n log n)`` union of ``n`` rectangles.
+"""
+
+import numpy as np
+import shapely
+
+from geohash_converter.decode import MAX_PRECISION, _compact
+from geohash_converter.lookup import point_bits
+from geohash_converter.setops import _covered, _merge, _normalize, _ranges
+
+_BITS = 5 * MAX_PRECISION // 2
+_MASK = (np.int64(1) << 31) - 1
+
+
+def _cell_rects(start, precision):
+    """``(x0, y0, width, height)`` of each cell on the full-precision grid."""
+    value = start.astype(np.uint64)
+    x0 = _compact(value >> np.uint64(1)).astype(np.int64)
+    y0 = _compact(value).astype(np.int64)
+    width = np.int64(1) << (_BITS - (5 * precision + 1) // 2)
+    height = np.int64(1) << (_BITS - 5 * precision // 2)
+    return x0, y0, width, height
+
+
+def _outline_pieces(line, lo, hi):
+    """Pieces of grid lines covered by exactly one of the ``[lo, hi)`` edges on them.
+
+    Cells are disjoint, so an edge piece is shared by at most two cells, one
+    on each side of its line. Returns ``(line, start, end)`` of every piece,
+    split at every edge end on the line.
+    """
+    points = np.concatenate(((line << 31) | lo, (line << 31) | hi))
+    weights = np.concatenate((np.ones(len(lo)), -np.ones(len(hi))))
+    points, inverse = np.unique(points, return_inverse=True)
+    depth = np.cumsum(np.bincount(inverse, weights=weights, minlength=len(points)))
+    # depth[i] holds on [points[i], points[i + 1]); it drops to 0 at a line's last point
+    piece = np.flatnonzero(np.rint(depth[:-1]) == 1)
+    return points[piece] >> 31, points[piece] & _MASK, points[piece + 1] & _MASK
+
+
+def _to_degrees(x, y):
+    """Longitude and latitude of full-precision grid corners (exact: powers of two)."""
+    lon = np.ldexp(x.astype(np.float64), -_BITS) * 360.0 - 180.0
+    lat = np.ldexp(y.astype(np.float64), -_BITS) * 180.0 - 90.0
+    return lon, lat
+
+
+def dissolve_geohashes(geohashes):
+    """Outline polygons of the area covered by ``geohashes`` (strings or int64 keys).
+
+    Returns a ``numpy`` array of shapely polygons, holes included; cells
+    touching only at a corner end up in separate polygons. Nested cells of
+    any precision are allowed.
+    """
+    start, end, precision = _normalize(*_ranges(geohashes))
+    if start.size == 0:
+        return np.empty(0, dtype=object)
+    x0, y0, width, height = _cell_rects(start, precision)
+
+    # Bottom and top edges on horizontal lines, left and right edges on vertical ones
+    h_line, h_lo, h_hi = _outline_pieces(np.concatenate((y0, y0 + height)), np.tile(x0, 2), np.tile(x0 + width, 2))
+    v_line, v_lo, v_hi = _outline_pieces(np.concatenate((x0, x0 + width)), np.tile(y0, 2), np.tile(y0 + height, 2))
+    lon0, lat0 = _to_degrees(np.concatenate((h_lo, v_line)), np.concatenate((h_line, v_lo)))
+    lon1, lat1 = _to_degrees(np.concatenate((h_hi, v_line)), np.concatenate((h_line, v_hi)))
+    pieces = shapely.linestrings(np.stack((np.column_stack((lon0, lat0)), np.column_stack((lon1, lat1))), axis=1))
+
+    faces = shapely.get_parts(shapely.polygonize(pieces))
+    inside = shapely.get_coordinates(shapely.point_on_surface(faces))
+    probe = point_bits(inside[:, 1], inside[:, 0]).astype(np.int64)
+    covered = _covered(probe, probe + 1, _merge(start, end))
+    # Drop the vertices of straight runs left by splitting edges at every corner
+    return shapely.simplify(faces[covered], 0)
@@ -0,0 +1,215 @@
+"""
+Streaming export writers.
+
+Every writer yields the payload as a sequence of ``bytes`` chunks built
+from ``chunk_size`` rows at a time, so no full GeoJSON/CSV string is ever
+held in memory. :func:`write_chunks` sends the chunks straight to a file or
+into a deflated zip member; :func:`export_bytes` does the same through a
+temporary file for APIs that need a ``bytes`` payload, such as
+``st.download_button``.
+
+Columnar binary formats (GeoParquet, FlatGeobuf, Arrow IPC) are produced by
+:func:`binary_export`. They need ``pyarrow`` (and GDAL through geopandas for
+FlatGeobuf); an ``ImportError`` is raised when it is not installed.
+"""
+
+import json
+import os
+import tempfile
+import zipfile
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from geohash_converter.decode import decode_bounds, geohashes_to_int
+
+CHUNK_SIZE = 50_000
+
+
+def _polygon_json(minx, miny, maxx, maxy):
+    # Same ring order as shapely.box, so output matches GeoDataFrame.to_json
+    return (
+        '{"type": "Polygon", "coordinates": [['
+        f"[{maxx!r}, {miny!r}], [{maxx!r}, {maxy!r}], [{minx!r}, {maxy!r}], "
+        f"[{minx!r}, {miny!r}], [{maxx!r}, {miny!r}]]]}}"
+    )
+
+
+def _point_json(x, y):
+    return f'{{"type": "Point", "coordinates": [{x!r}, {y!r}]}}'
+
+
+def geojson_chunks(df: pd.DataFrame, geohash_column: str = "geohash", geometry: str = "polygon",
+                   chunk_size: int = CHUNK_SIZE):
+    """Yield a GeoJSON FeatureCollection of geohash cells in chunks.
+
+    Geometries are written straight from the decoded cell bounds, as cell
+    polygons or, with ``geometry="centroid"``, as cell centre points. All
+    columns except ``geometry`` become feature properties.
+    """
+    if geometry not in ("polygon", "centroid"):
+        raise ValueError(f"geometry must be 'polygon' or 'centroid', got {geometry!r}")
+    yield b'{"type": "FeatureCollection", "features": ['
+    for start in range(0, len(df), chunk_size):
+        part = df.iloc[start:start + chunk_size]
+        bounds = [b.tolist() for b in decode_bounds(part[geohash_column].astype(str).to_numpy())]
+        props = part.drop(columns=["geometry"], errors="ignore").to_json(orient="records", lines=True).splitlines()
+        if geometry == "polygon":
+            geoms = [_polygon_json(*b) for b in zip(*bounds)]
+        else:
+            geoms = [_point_json((x0 + x1) / 2, (y0 + y1) / 2) for x0, y0, x1, y1 in zip(*bounds)]
+        features = ", ".join(
+            f'{{"id": {json.dumps(str(i))}, "type": "Feature", "properties": {p}, "geometry": {g}}}'
+            for i, p, g in zip(part.index, props, geoms)
+        )
+        yield (", " if start else "").encode("utf-8") + features.encode("utf-8")
+    yield b"]}"
+
+
+def outline_chunks(polygons, chunk_size: int = CHUNK_SIZE):
+    """Yield a GeoJSON FeatureCollection of dissolved outline polygons in chunks.
+
+    ``polygons`` is an array of shapely polygons such as
+    :func:`~geohash_converter.dissolve.dissolve_geohashes` returns; each one
+    becomes a feature with its ``part`` number and its ``area_km2``.
+    """
+    polygons = np.asarray(polygons, dtype=object)
+    yield b'{"type": "FeatureCollection", "features": ['
+    for start in range(0, len(polygons), chunk_size):
+        part = polygons[start:start + chunk_size]
+        areas = gpd.GeoSeries(part, crs="EPSG:4326").to_crs(6933).area / 1e6
+        features = ", ".join(
+            f'{{"id": "{i}", "type": "Feature", "properties": {{"part": {i}, "area_km2": {a!r}}}, "geometry": {g}}}'
+            for i, a, g in zip(range(start, start + len(part)), areas.round(6).tolist(), shapely.to_geojson(part))
+        )
+        yield (", " if start else "").encode("utf-8") + features.encode("utf-8")
+    yield b"]}"
+
+
+def csv_chunks(df: pd.DataFrame, chunk_size: int = CHUNK_SIZE, **to_csv_kwargs):
+    """Yield ``df.to_csv(**to_csv_kwargs)`` in chunks, header only once."""
+    if len(df) == 0:
+        yield df.to_csv(**to_csv_kwargs).encode("utf-8")
+        return
+    for start in range(0, len(df), chunk_size):
+        part = df.iloc[start:start + chunk_size]
+        yield part.to_csv(header=start == 0, **to_csv_kwargs).encode("utf-8")
+
+
+def frames_csv_chunks(frames, **to_csv_kwargs):
+    """Yield one CSV from an iterable of DataFrames, header from the first."""
+    header = True
+    for frame in frames:
+        yield frame.to_csv(header=header, **to_csv_kwargs).encode("utf-8")
+        header = False
+
+
+def delimited_chunks(values, sep: str = ",", json_array: bool = False, chunk_size: int = CHUNK_SIZE):
+    """Yield ``values`` joined by ``sep``, or as a JSON array of strings."""
+    values = list(values)
+    if json_array:
+        sep = ", "
+        yield b"["
+    for start in range(0, len(values), chunk_size):
+        part = values[start:start + chunk_size]
+        items = [json.dumps(str(v)) for v in part] if json_array else [str(v) for v in part]
+        yield ((sep if start else "") + sep.join(items)).encode("utf-8")
+    if json_array:
+        yield b"]"
+
+
+def write_chunks(chunks, fileobj, zip_member: str = None):
+    """Write chunks to ``fileobj``, optionally as a deflated zip member."""
+    if zip_member is None:
+        for chunk in chunks:
+            fileobj.write(chunk)
+        return
+    with zipfile.ZipFile(fileobj, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open(zip_member, mode="w", force_zip64=True) as out:
+            for chunk in chunks:
+                out.write(chunk)
+
+
+def export_bytes(chunks, zip_member: str = None) -> bytes:
+    """Spool chunks through a temporary file and return the final payload.
+
+    Only the finished (and, with ``zip_member``, compressed) payload is
+    materialised; intermediate strings never exceed one chunk.
+    """
+    with tempfile.TemporaryFile() as f:
+        write_chunks(chunks, f, zip_member)
+        f.seek(0)
+        return f.read()
+
+
+# label -> (file extension, mime type)
+BINARY_FORMATS = {
+    "GeoParquet": (".parquet", "application/vnd.apache.parquet"),
+    "FlatGeobuf": (".fgb", "application/octet-stream"),
+    "Arrow IPC": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def _cells_frame(df, geohash_column, with_int):
+    """Attributes of ``df`` plus cell geometry and the optional integer key."""
+    out = pd.DataFrame(df).drop(columns=["geometry"], errors="ignore").copy()
+    geohashes = out[geohash_column].astype(str).to_numpy()
+    if with_int:
+        out[geohash_column + "_int"] = geohashes_to_int(geohashes)
+    minx, miny, maxx, maxy = decode_bounds(geohashes)
+    return gpd.GeoDataFrame(out, geometry=shapely.box(minx, miny, maxx, maxy), crs="EPSG:4326")
+
+
+def _wkb_schema(df, geohash_column, with_int, geo_metadata=False):
+    """Arrow schema of the cells table, inferred from all rows of ``df``.
+
+    Chunks are written against this one schema, so a column that is empty
+    in the first chunk still gets the type of its later values.
+    """
+    import pyarrow as pa
+
+    attrs = pd.DataFrame(df).drop(columns=["geometry"], errors="ignore")
+    schema = pa.Schema.from_pandas(attrs, preserve_index=False)
+    if with_int:
+        schema = schema.append(pa.field(geohash_column + "_int", pa.int64()))
+    schema = schema.append(pa.field("geometry", pa.binary()))
+    if geo_metadata:
+        # GeoParquet 1.0 metadata; no "crs" key means OGC:CRS84 (lon/lat)
+        geo = {
+            "version": "1.0.0",
+            "primary_column": "geometry",
+            "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["Polygon"]}},
+        }
+        schema = schema.with_metadata({**(schema.metadata or {}), b"geo": json.dumps(geo).encode()})
+    return schema
+
+
+def binary_export(df: pd.DataFrame, fmt: str, geohash_column: str = "geohash",
+                  with_int: bool = False, chunk_size: int = CHUNK_SIZE) -> bytes:
+    """Export geohash cells as GeoParquet, FlatGeobuf or Arrow IPC bytes.
+
+    ``fmt`` is a key of :data:`BINARY_FORMATS`. With ``with_int`` an extra
+    ``<geohash_column>_int`` int64 column (see
+    :func:`~geohash_converter.decode.geohashes_to_int`) is written.
+    """
+    if fmt not in BINARY_FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {list(BINARY_FORMATS)}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cells" + BINARY_FORMATS[fmt][0])
+        if fmt == "FlatGeobuf":
+            _cells_frame(df, geohash_column, with_int).to_file(path, driver="FlatGeobuf")
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            # One row group / record batch per chunk, written as it is built
+            schema = _wkb_schema(df, geohash_column, with_int, geo_metadata=fmt == "GeoParquet")
+            writer = pq.ParquetWriter(path, schema) if fmt == "GeoParquet" else pa.ipc.new_file(path, schema)
+            for start in range(0, max(len(df), 1), chunk_size):
+                part = _cells_frame(df.iloc[start:start + chunk_size], geohash_column, with_int)
+                writer.write_table(pa.Table.from_pandas(part.to_wkb(), schema=schema, preserve_index=False))
+            writer.close()
+        with open(path, "rb") as f:
+            return f.read()
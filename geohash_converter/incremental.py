@@ -0,0 +1,111 @@
+"""
+Incremental cover of a changing set of shapes.
+
+The drawing page reruns after every new, edited or deleted shape.
+:class:`CoverSet` keeps the cells of each shape keyed by its geometry
+fingerprint, so a rerun only covers shapes it has not seen before. The
+union is kept as sorted ``int64`` geohash keys: new shapes are merged into
+it and a removed shape triggers a rebuild from the remaining shapes, so
+only cells no other shape covers disappear.
+"""
+
+import threading
+
+import numpy as np
+
+from geohash_converter.budget import CellBudgetExceeded
+from geohash_converter.cache import geometry_fingerprint
+from geohash_converter.cover import cover_geometry
+from geohash_converter.decode import geohashes_to_int, int_to_geohashes
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+class CoverSet:
+    """
+    Union of the covers of a set of shapes, updated shape by shape.
+
+    Meant to live in ``st.session_state``; changing the precision or the
+    ``inner`` flag starts over. Shapes are covered outside the lock and only
+    merged under it, so a job being cancelled never holds up its
+    replacement.
+
+    Examples
+    --------
+    >>> covers = CoverSet()
+    >>> cells = covers.update(gdf.geometry, 7)
+    >>> covers.computed  # shapes covered by the last update
+    """
+
+    def __init__(self):
+        self.precision = None
+        self.inner = None
+        self.computed = 0
+        self._cells = {}
+        self._keys = ()
+        self._union = _EMPTY
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._union)
+
+    def _reset(self, precision, inner):
+        if (precision, bool(inner)) != (self.precision, self.inner):
+            self.precision, self.inner = precision, bool(inner)
+            self._cells, self._keys, self._union = {}, (), _EMPTY
+
+    def update(self, geometries, precision: int, inner: bool = False, max_cells=None, progress=None, check=None):
+        """Bring the set in line with ``geometries`` and return :meth:`cells`.
+
+        Raises :class:`~geohash_converter.budget.CellBudgetExceeded` when a
+        shape or the union needs more than ``max_cells`` cells.
+        ``progress(done, total)`` is called before each new shape is
+        covered and ``check()`` during each cover (see
+        :func:`~geohash_converter.cover.polygon_to_geohashes`); an exception
+        raised from either leaves the set unchanged.
+        """
+        geometries = list(geometries)
+        keys = tuple(geometry_fingerprint(g) for g in geometries)
+        shapes = dict(zip(keys, geometries))
+        computed = 0
+        while True:
+            with self._lock:
+                self._reset(precision, inner)
+                todo = {key: g for key, g in shapes.items() if key not in self._cells}
+                if not todo:
+                    self.computed = computed
+                    return self._commit(keys, precision, max_cells)
+            # Covers run outside the lock, so a replacement update is never
+            # blocked behind a cover that is being cancelled
+            added = {}
+            for done, (key, geometry) in enumerate(todo.items()):
+                if progress is not None:
+                    progress(done, len(todo))
+                added[key] = geohashes_to_int(
+                    cover_geometry(geometry, precision, inner, max_cells=max_cells, check=check)
+                )
+            with self._lock:
+                # Another update may have changed the settings meanwhile;
+                # then the loop covers what it dropped again
+                self._reset(precision, inner)
+                self._cells.update(added)
+            computed += len(added)
+
+    def _commit(self, keys, precision, max_cells):
+        """Drop removed shapes and update the union; called with the lock held."""
+        current, previous = set(keys), set(self._keys)
+        removed = [key for key in self._cells if key not in current]
+        for key in removed:
+            del self._cells[key]
+        if removed or not previous <= current:
+            self._union = np.unique(np.concatenate([_EMPTY, *self._cells.values()]))
+        elif current - previous:
+            self._union = np.unique(np.concatenate([self._union, *(self._cells[k] for k in current - previous)]))
+        self._keys = keys
+        if max_cells is not None and len(self._union) > max_cells:
+            raise CellBudgetExceeded(len(self._union), max_cells, precision)
+        return self.cells()
+
+    def cells(self):
+        """Sorted numpy string array of every covered geohash."""
+        return int_to_geohashes(self._union)
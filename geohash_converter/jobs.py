@@ -0,0 +1,164 @@
+"""
+Background jobs for covers and decodes.
+
+Long covers used to run on the Streamlit script thread: the page froze and
+every rerun queued more work behind the running one. :func:`submit` runs a
+job on a thread pool shared by every session of the server instead; the
+page keeps only the job id in ``st.session_state`` and polls
+:attr:`Job.progress`.
+
+Cancellation is cooperative: the job function receives its :class:`Job`
+and calls :meth:`Job.report` between units of work (features, batches,
+chunks of cells inside a cover), which raises :class:`JobCancelled` once
+:meth:`Job.cancel` was called. A cancelled job never ends as ``"done"``.
+:func:`ensure` gives a page one job slot keyed on its inputs, so a rerun
+with other inputs cancels the stale job rather than waiting behind it.
+
+``GEOHASH_JOB_WORKERS`` sets the pool size (default: number of CPUs).
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+MAX_FINISHED = 64
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when its job has been cancelled."""
+
+
+class Job:
+    """
+    Handle of a background job.
+
+    ``status`` is one of ``"queued"``, ``"running"``, ``"done"``,
+    ``"cancelled"`` and ``"failed"``; ``progress`` is a fraction between 0
+    and 1 and ``message`` the last text reported. ``timings`` holds the
+    seconds spent in each :meth:`phase`.
+    """
+
+    def __init__(self, job_id, key):
+        self.id = job_id
+        self.key = key
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        self.timings = {}
+        self._cancel = threading.Event()
+
+    def __repr__(self):
+        return f"Job({self.id!r}, status={self.status!r}, progress={self.progress:.2f})"
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def done(self) -> bool:
+        return self.status in ("done", "cancelled", "failed")
+
+    def cancel(self):
+        """Ask the job to stop at its next :meth:`report`; queued jobs never start."""
+        self._cancel.set()
+
+    def report(self, progress=None, message=None):
+        """Record progress from inside the job; raises :class:`JobCancelled` if cancelled."""
+        if progress is not None:
+            self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block; repeated phases of one name add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def _run(self, fn, args, kwargs):
+        try:
+            self.status = "running"
+            self.report()
+            result = fn(self, *args, **kwargs)
+            # A job cancelled after its last report still counts as cancelled
+            self.report()
+            self.result = result
+            self.progress = 1.0
+            self.status = "done"
+        except JobCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.error = e
+            self.status = "failed"
+        finally:
+            self.finished = time.time()
+            _retire(self)
+
+
+_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("GEOHASH_JOB_WORKERS", 0)) or os.cpu_count() or 1,
+    thread_name_prefix="geohash-job",
+)
+_jobs = {}
+_finished = OrderedDict()
+_lock = threading.Lock()
+_ids = itertools.count(1)
+
+
+def _retire(job):
+    # Finished jobs stay readable for a while; the oldest are forgotten
+    with _lock:
+        _finished[job.id] = None
+        while len(_finished) > MAX_FINISHED:
+            _jobs.pop(_finished.popitem(last=False)[0], None)
+
+
+def submit(fn, *args, key=None, **kwargs) -> Job:
+    """Run ``fn(job, *args, **kwargs)`` on the shared pool and return its job."""
+    job = Job(f"job-{next(_ids)}", key)
+    with _lock:
+        _jobs[job.id] = job
+    _pool.submit(job._run, fn, args, kwargs)
+    return job
+
+
+def get(job_id):
+    """The job with ``job_id``, or ``None`` when unknown or forgotten."""
+    return _jobs.get(job_id)
+
+
+def cancel(job_id):
+    """Cancel a job by id; unknown ids are ignored."""
+    job = get(job_id)
+    if job is not None:
+        job.cancel()
+
+
+def ensure(state, slot, key, fn, *args, **kwargs) -> Job:
+    """The job in ``state[slot]`` for ``key``, submitting one if needed.
+
+    ``state`` is a mapping such as ``st.session_state`` holding job ids. The
+    job for the same key is returned whatever its status, so a job the user
+    cancelled stays cancelled until the inputs change (or the slot is
+    cleared); a job for another key is cancelled and replaced.
+    """
+    job = get(state.get(slot))
+    if job is not None and job.key == key:
+        return job
+    if job is not None:
+        job.cancel()
+    job = submit(fn, *args, key=key, **kwargs)
+    state[slot] = job.id
+    return job
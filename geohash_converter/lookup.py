@@ -0,0 +1,110 @@
+"""
+Point-in-cell lookup over a set of geohashes.
+
+:class:`GeohashIndex` keeps the cells as sorted ``int64`` keys (see
+:func:`~geohash_converter.decode.geohashes_to_int`). A point is encoded
+straight into the same 60-bit layout; its prefix at every precision is a
+single key and all descendants of a prefix form one contiguous key range,
+so each question is a binary search and a lookup costs ``O(log n)`` no
+matter how many cells are in the set or drawn on the map.
+"""
+
+import numpy as np
+import pandas as pd
+
+from geohash_converter.decode import _SIGN, MAX_PRECISION, geohashes_to_int, int_to_geohashes
+
+_BITS = 5 * MAX_PRECISION
+_LAT_BITS = _BITS // 2
+_LON_BITS = (_BITS + 1) // 2
+
+
+def _grid_index(value, low, span, bits):
+    index = np.floor((value - low) / span * (1 << bits)).astype(np.int64)
+    return np.clip(index, 0, (1 << bits) - 1)
+
+
+def point_bits(lat, lon):
+    """Interleaved 60-bit geohash value of each point at full precision."""
+    lat = np.asarray(lat, dtype=np.float64).reshape(-1)
+    lon = (np.asarray(lon, dtype=np.float64).reshape(-1) + 180.0) % 360.0 - 180.0
+    lat_i = _grid_index(lat, -90.0, 180.0, _LAT_BITS).astype(np.uint64)
+    lon_i = _grid_index(lon, -180.0, 360.0, _LON_BITS).astype(np.uint64)
+    value = np.zeros(len(lat), dtype=np.uint64)
+    # Geohash bits alternate longitude, latitude, starting with longitude
+    for bit in range(_LON_BITS - 1, -1, -1):
+        value = (value << np.uint64(1)) | ((lon_i >> np.uint64(bit)) & np.uint64(1))
+        if bit < _LAT_BITS:
+            value = (value << np.uint64(1)) | ((lat_i >> np.uint64(bit)) & np.uint64(1))
+    return value
+
+
+def _prefix_ranges(bits, precision):
+    """``(first, last)`` int64 keys of the prefix of ``bits`` and of its descendants.
+
+    ``first`` is the prefix itself at ``precision`` (scalar or array);
+    every descendant key lies in ``[first, last]``.
+    """
+    precision = np.asarray(precision, dtype=np.uint64)
+    free = np.uint64(5) * (np.uint64(MAX_PRECISION) - precision)
+    top = (bits >> free) << free
+    first = (top << np.uint64(4)) | precision
+    last = ((top | ((np.uint64(1) << free) - np.uint64(1))) << np.uint64(4)) | np.uint64(15)
+    return (first ^ _SIGN).view(np.int64), (last ^ _SIGN).view(np.int64)
+
+
+def encode_points(lat, lon, precision: int = MAX_PRECISION):
+    """Geohash of each point as a numpy string array."""
+    if not 1 <= precision <= MAX_PRECISION:
+        raise ValueError(f"precision must be between 1 and {MAX_PRECISION}, got {precision}")
+    first, _ = _prefix_ranges(point_bits(lat, lon), precision)
+    return int_to_geohashes(first)
+
+
+class GeohashIndex:
+    """
+    Sorted-key index over a set of geohashes of any precision.
+
+    Parameters
+    ----------
+    geohashes : sequence of str
+        The cells to index; duplicates are dropped.
+
+    Examples
+    --------
+    >>> index = GeohashIndex(["qqguw", "qqguwx", "qqgux"])
+    >>> index.containing(-6.17, 106.83)
+    """
+
+    def __init__(self, geohashes):
+        self.keys = np.unique(geohashes_to_int(list(geohashes)))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, lat: float, lon: float) -> pd.DataFrame:
+        """The point's cell at every precision and how the set relates to it.
+
+        One row per precision with the point's ``geohash`` at that
+        precision, ``in_set`` when that very cell is indexed and
+        ``cells_within``, the number of indexed cells inside it (itself
+        included). Ancestors of an indexed cell have ``cells_within > 0``;
+        its descendants containing the point are the rows below it.
+        """
+        precision = np.arange(1, MAX_PRECISION + 1)
+        first, last = _prefix_ranges(point_bits(lat, lon)[0], precision)
+        lo = np.searchsorted(self.keys, first, side="left")
+        hi = np.searchsorted(self.keys, last, side="right")
+        in_set = lo < len(self.keys)
+        in_set[in_set] = self.keys[lo[in_set]] == first[in_set]
+        return pd.DataFrame({
+            "precision": precision,
+            "geohash": int_to_geohashes(first),
+            "in_set": in_set,
+            "cells_within": hi - lo,
+        })
+
+    def containing(self, lat: float, lon: float) -> list:
+        """Indexed cells containing the point, coarsest first."""
+        table = self.lookup(lat, lon)
+        return table.loc[table["in_set"], "geohash"].tolist()
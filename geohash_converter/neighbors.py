@@ -0,0 +1,100 @@
+"""
+Vectorized k-ring neighbours of geohash sets.
+
+Cells are decoded to integer grid indices, shifted to their 8 neighbours
+and encoded back (see :func:`~geohash_converter.decode.indices_to_int`),
+all in NumPy integer arithmetic. Longitude wraps at the antimeridian; a
+step over a pole lands in the mirrored row on the far side of the pole,
+180 degrees of longitude away.
+
+The set is grown one ring at a time and only from the ring added last, so
+memory follows the outline of the set rather than ``n * (2k + 1)**2``.
+Each precision is grown on its own grid and the result goes through
+:mod:`~geohash_converter.setops`, so mixed-precision sets come out without
+nested cells. Given ``max_cells``, the growth stops with
+:class:`~geohash_converter.budget.CellBudgetExceeded` as soon as the first
+ring shows that ``k`` rings would pass it.
+"""
+
+import numpy as np
+
+from geohash_converter.budget import CellBudgetExceeded
+from geohash_converter.decode import MAX_PRECISION, _compact, indices_to_int
+from geohash_converter.setops import _keys, _ranges, geohash_difference, geohash_union
+
+MAX_RING = 20
+# Cells whose neighbours are encoded in one batch
+CHUNK_SIZE = 500_000
+
+_NO_CELLS = np.zeros(0, dtype=np.int64)
+_BITS = 5 * MAX_PRECISION // 2
+# Row and column steps to the 8 neighbours
+_DY = np.array([-1, -1, -1, 0, 0, 1, 1, 1])
+_DX = np.array([-1, 0, 1, -1, 1, -1, 0, 1])
+
+
+def _neighbours(keys, precision):
+    """Sorted unique keys of the 8 neighbours of cells of one ``precision``."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    rows, cols = 1 << lat_bits, 1 << lon_bits
+    found = [_NO_CELLS]
+    for start in range(0, len(keys), CHUNK_SIZE):
+        value = _ranges(keys[start:start + CHUNK_SIZE])[0].astype(np.uint64)
+        lat = (_compact(value).astype(np.int64) >> (_BITS - lat_bits))[:, None] + _DY
+        lon = (_compact(value >> np.uint64(1)).astype(np.int64) >> (_BITS - lon_bits))[:, None] + _DX
+        south, north = lat < 0, lat >= rows
+        lat = np.where(south, -lat - 1, np.where(north, 2 * rows - 1 - lat, lat))
+        lon = np.where(south | north, lon + cols // 2, lon) % cols
+        found.append(np.unique(indices_to_int(lat.ravel(), lon.ravel(), precision)))
+    return np.unique(np.concatenate(found))
+
+
+def _grow(keys, precision, k, limit):
+    """Sorted keys of ``keys`` (one precision) and every cell within ``k`` steps."""
+    grown = frontier = keys
+    for step in range(1, k + 1):
+        ring = _neighbours(frontier, precision)
+        ring = ring[~np.isin(ring, grown, assume_unique=True)]
+        grown, frontier = np.union1d(grown, ring), ring
+        if limit is not None:
+            # Each further ring is about 8 cells longer than the one before
+            left = k - step
+            expected = len(grown) + len(ring) * left + 4 * left * (left + 1)
+            if expected > limit:
+                raise CellBudgetExceeded(expected, limit, precision)
+        if ring.size == 0:
+            break
+    return grown
+
+
+def _ring_keys(geohashes, k, max_cells=None):
+    """int64 keys of every cell within ``k`` steps of a cell of ``geohashes``."""
+    if not 0 <= k <= MAX_RING:
+        raise ValueError(f"k must be between 0 and {MAX_RING}, got {k}")
+    keys = np.unique(_keys(geohashes))
+    precision = _ranges(keys)[2]
+    parts, used = [], 0
+    for p in np.unique(precision):
+        limit = None if max_cells is None else max_cells - used
+        parts.append(_grow(keys[precision == p], int(p), k, limit))
+        used += len(parts[-1])
+    return np.concatenate([_NO_CELLS, *parts])
+
+
+def k_ring(geohashes, k: int = 1, max_cells=None) -> list:
+    """The cells plus every neighbour within ``k`` steps (8-connected). Sorted.
+
+    Neighbours are taken at the precision of the cell they surround. Raises
+    :class:`~geohash_converter.budget.CellBudgetExceeded` when the result
+    would pass ``max_cells``.
+    """
+    return geohash_union(_ring_keys(geohashes, k, max_cells), _NO_CELLS)
+
+
+def boundary_ring(geohashes, k: int = 1, max_cells=None) -> list:
+    """Only the cells within ``k`` steps around the set, not the set itself. Sorted.
+
+    ``max_cells`` bounds the set and its rings together, as in :func:`k_ring`.
+    """
+    return geohash_difference(_ring_keys(geohashes, k, max_cells), _keys(geohashes))
@@ -0,0 +1,116 @@
+"""
+Bulk parsing of pasted polygons.
+
+:func:`parse_polygons` accepts three layouts and returns one row per polygon
+with its ``Name`` (the column the single-polygon page always had):
+
+- coordinate lists ``lat, lon, lat, lon, ...`` (commas, spaces or new
+  lines), one polygon per block, blocks separated by a blank line;
+- WKT ``POLYGON``/``MULTIPOLYGON``, one per block or per line;
+- CSV with a header holding an id column (``id`` or ``name``) and either a
+  ``wkt``/``geometry`` column or ``lat``/``lon`` columns with one vertex per
+  row, vertices grouped by id in order of appearance.
+
+All numbers of a paste are converted in one NumPy call and the rings are
+built in bulk with ``shapely.linearrings``.
+"""
+
+import io
+import re
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+_BLANK_LINE = re.compile(r"\n\s*\n")
+_NUMBER_SEP = re.compile(r"[,;\s]+")
+_WKT_START = re.compile(r"^\s*(MULTI)?POLYGON\b", re.IGNORECASE | re.MULTILINE)
+_ID_COLUMNS = ("id", "name")
+_WKT_COLUMNS = ("wkt", "geometry", "geom")
+_LAT_COLUMNS = ("lat", "latitude", "y")
+_LON_COLUMNS = ("lon", "lng", "long", "longitude", "x")
+
+
+def _column(columns, names):
+    lower = {str(c).strip().lower(): c for c in columns}
+    return next((lower[n] for n in names if n in lower), None)
+
+
+def _rings(lat, lon, group, ids):
+    """Polygons from vertex arrays grouped by ``group`` (0..n-1)."""
+    counts = np.bincount(group, minlength=len(ids))
+    short = np.flatnonzero(counts < 3)
+    if short.size:
+        raise ValueError(f"Polygon {ids[short[0]]!r} needs at least 3 points, got {counts[short[0]]}")
+    rings = shapely.linearrings(np.column_stack((lon, lat)), indices=group)
+    return shapely.polygons(rings)
+
+
+def _from_coordinate_blocks(blocks):
+    tokens = [[t for t in _NUMBER_SEP.split(block.strip()) if t] for block in blocks]
+    counts = np.array([len(t) for t in tokens])
+    ids = ["polygon"] if len(blocks) == 1 else [f"polygon_{i + 1}" for i in range(len(blocks))]
+    odd = np.flatnonzero(counts % 2)
+    if odd.size:
+        raise ValueError(f"Polygon {ids[odd[0]]!r} has an odd number of values ({counts[odd[0]]}); expected lat, lon pairs")
+    try:
+        values = np.array([t for block in tokens for t in block], dtype=np.float64)
+    except ValueError as e:
+        raise ValueError(f"Invalid coordinate: {e}") from None
+    group = np.repeat(np.arange(len(blocks)), counts // 2)
+    return ids, _rings(values[0::2], values[1::2], group, ids)
+
+
+def _from_wkt(text):
+    starts = [m.start() for m in _WKT_START.finditer(text)]
+    statements = [text[a:b].strip() for a, b in zip(starts, starts[1:] + [len(text)])]
+    ids = [f"polygon_{i + 1}" for i in range(len(statements))]
+    try:
+        geometries = shapely.from_wkt(statements)
+    except shapely.errors.GEOSException as e:
+        raise ValueError(f"Invalid WKT: {e}") from None
+    return ids, geometries
+
+
+def _from_csv(text):
+    df = pd.read_csv(io.StringIO(text), skipinitialspace=True)
+    id_col = _column(df.columns, _ID_COLUMNS)
+    wkt_col = _column(df.columns, _WKT_COLUMNS)
+    lat_col, lon_col = _column(df.columns, _LAT_COLUMNS), _column(df.columns, _LON_COLUMNS)
+    if id_col is None or (wkt_col is None and (lat_col is None or lon_col is None)):
+        raise ValueError("CSV needs an id column and either a wkt column or lat/lon columns")
+    if wkt_col is not None:
+        try:
+            geometries = shapely.from_wkt(df[wkt_col].astype(str).to_numpy())
+        except shapely.errors.GEOSException as e:
+            raise ValueError(f"Invalid WKT: {e}") from None
+        return df[id_col].astype(str).tolist(), geometries
+    codes, ids = pd.factorize(df[id_col].astype(str), sort=False)
+    order = np.argsort(codes, kind="stable")
+    lat = pd.to_numeric(df[lat_col], errors="raise").to_numpy(dtype=np.float64)[order]
+    lon = pd.to_numeric(df[lon_col], errors="raise").to_numpy(dtype=np.float64)[order]
+    ids = list(ids)
+    return ids, _rings(lat, lon, codes[order], ids)
+
+
+def parse_polygons(text: str) -> gpd.GeoDataFrame:
+    """Parse pasted polygons into a GeoDataFrame with ``Name`` and ``geometry``.
+
+    A single coordinate list is named ``"polygon"``; several are
+    ``"polygon_1"``, ``"polygon_2"``, ... and CSV rows keep their id.
+
+    Raises ``ValueError`` with the offending polygon or value when the paste
+    cannot be parsed.
+    """
+    text = (text or "").replace("\r\n", "\n").strip()
+    if not text:
+        raise ValueError("No coordinates given")
+    first_line = text.split("\n", 1)[0]
+    if _WKT_START.match(text):
+        ids, geometries = _from_wkt(text)
+    elif re.search(r"[A-Za-z]", first_line) and _column(re.split(r"[,;\t]", first_line), _ID_COLUMNS):
+        ids, geometries = _from_csv(text)
+    else:
+        ids, geometries = _from_coordinate_blocks(_BLANK_LINE.split(text))
+    return gpd.GeoDataFrame({"Name": ids}, geometry=list(geometries), crs="EPSG:4326")
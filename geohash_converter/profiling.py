@@ -0,0 +1,172 @@
+"""
+Per-stage instrumentation for page reruns.
+
+Switched on by setting ``GEOHASH_PROFILE=1``. Each page creates one
+:class:`StageProfiler` per rerun and wraps its stages (cover, decode,
+export, map rendering, ``st_folium``) in :meth:`StageProfiler.stage`. For
+every stage the wall time, resident memory after the stage, the process
+peak RSS and the size of the stage's output are recorded. :meth:`flush`
+appends the rerun as one JSON line to ``GEOHASH_PROFILE_LOG`` (default
+``geohash_profile.jsonl`` in the working directory).
+
+Stages that run in a background job (see :mod:`~geohash_converter.jobs`)
+are timed by the job itself and added with :meth:`StageProfiler.record`
+once the job has finished.
+
+When profiling is off, :meth:`StageProfiler.stage` does no measuring at all.
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_ENV = "GEOHASH_PROFILE"
+PROFILE_LOG_ENV = "GEOHASH_PROFILE_LOG"
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _rss_bytes():
+    """Current resident set size, or ``None`` where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _output_size(obj):
+    """(rows, bytes) of a stage output; either may be ``None``."""
+    if obj is None:
+        return None, None
+    if isinstance(obj, (bytes, bytearray)):
+        return None, len(obj)
+    if isinstance(obj, str):
+        return None, len(obj.encode("utf-8"))
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return len(obj), int(obj.memory_usage(deep=True))
+    if hasattr(obj, "get_root"):
+        # folium map: size of the HTML handed to the browser
+        return None, len(obj.get_root().render().encode("utf-8"))
+    try:
+        return len(obj), None
+    except TypeError:
+        return None, None
+
+
+class _Stage:
+    __slots__ = ("output",)
+
+    def __init__(self):
+        self.output = None
+
+
+class StageProfiler:
+    """
+    Collects stage measurements for a single page rerun.
+
+    Parameters
+    ----------
+    page : str
+        Page name written with every record.
+    enabled : bool, optional
+        Defaults to the ``GEOHASH_PROFILE`` environment variable.
+    log_path : str, optional
+        JSON lines file; defaults to ``GEOHASH_PROFILE_LOG`` or
+        ``geohash_profile.jsonl``.
+
+    Examples
+    --------
+    >>> prof = StageProfiler("Drawing_Polygon")
+    >>> with prof.stage("cover") as s:
+    ...     s.output = create_geohash_list(gdf, 7)
+    """
+
+    def __init__(self, page, enabled=None, log_path=None):
+        self.page = page
+        self.enabled = profiling_enabled() if enabled is None else enabled
+        self.log_path = log_path or os.environ.get(PROFILE_LOG_ENV, "geohash_profile.jsonl")
+        self.rerun_id = uuid.uuid4().hex
+        self.started = time.time()
+        self.records = []
+
+    @contextmanager
+    def stage(self, name):
+        """Measure the enclosed block; assign its result to ``.output``."""
+        handle = _Stage()
+        if not self.enabled:
+            yield handle
+            return
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            self._append(name, time.perf_counter() - start, rss_before, handle.output)
+
+    def record(self, name, seconds, output=None):
+        """Add a stage timed elsewhere, e.g. a phase of a background job.
+
+        Memory is read now; the change over the stage is unknown.
+        """
+        if self.enabled:
+            self._append(name, seconds, None, output)
+
+    def _append(self, name, seconds, rss_before, output):
+        rss_after = _rss_bytes()
+        peak = _peak_rss_bytes()
+        rows, nbytes = _output_size(output)
+        self.records.append({
+            "stage": name,
+            "seconds": round(seconds, 6),
+            "rss_mb": None if rss_after is None else round(rss_after / 2**20, 1),
+            "rss_delta_mb": None if rss_after is None or rss_before is None
+            else round((rss_after - rss_before) / 2**20, 1),
+            "peak_rss_mb": None if peak is None else round(peak / 2**20, 1),
+            "output_rows": rows,
+            "output_bytes": nbytes,
+        })
+
+    def frame(self) -> pd.DataFrame:
+        """Recorded stages as a table, one row per stage."""
+        return pd.DataFrame(self.records, columns=[
+            "stage", "seconds", "rss_mb", "rss_delta_mb", "peak_rss_mb", "output_rows", "output_bytes",
+        ])
+
+    def flush(self):
+        """Append this rerun to the JSON lines log and reset the records."""
+        if not self.enabled or not self.records:
+            return
+        entry = {
+            "timestamp": self.started,
+            "page": self.page,
+            "rerun_id": self.rerun_id,
+            "pid": os.getpid(),
+            "total_seconds": round(sum(r["seconds"] for r in self.records), 6),
+            "stages": self.records,
+        }
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.records = []
@@ -0,0 +1,144 @@
+"""
+Streaming GeoJSON reader.
+
+``gpd.read_file`` materialises the whole upload (and GDAL's copy of it)
+before the first feature is covered. :func:`iter_features` instead reads the
+byte stream in blocks and decodes one feature at a time with
+``json.JSONDecoder.raw_decode``; only the top-level members are parsed by
+hand. :func:`read_feature_batches` groups the features into small
+GeoDataFrames, so peak memory follows the batch size rather than the file
+size.
+
+Coordinates are taken as WGS84 longitude/latitude (RFC 7946); a legacy
+``crs`` member is ignored.
+"""
+
+import codecs
+import json
+import re
+
+import geopandas as gpd
+
+BLOCK_SIZE = 1 << 20
+BATCH_SIZE = 1000
+GEOMETRY_TYPES = {
+    "Point", "MultiPoint", "LineString", "MultiLineString", "Polygon", "MultiPolygon", "GeometryCollection",
+}
+
+_WHITESPACE = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+class _Stream:
+    """Decoded text buffer over a binary (or text) file, refilled on demand."""
+
+    def __init__(self, fileobj, block_size, progress):
+        self.fileobj = fileobj
+        self.block_size = block_size
+        self.progress = progress
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        """Append at least one more block; returns False at end of file."""
+        if self.eof:
+            return False
+        if self.pos > len(self.buf) // 2:
+            self.buf, self.pos = self.buf[self.pos:], 0
+        raw = self.fileobj.read(size or self.block_size)
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        self.bytes_read += len(raw)
+        if self.progress is not None:
+            self.progress(self.bytes_read)
+        self.eof = not raw
+        self.buf += self.decoder.decode(raw, final=self.eof)
+        return not self.eof or bool(raw)
+
+    def peek(self):
+        """Next non-whitespace character, or '' at end of input."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            found = self.buf[self.pos:self.pos + 20] or "end of file"
+            raise ValueError(f"Invalid GeoJSON: expected {char!r} at byte ~{self.bytes_read}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value, reading more input until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Probably cut at the end of the buffer; double it and retry
+                if not self.fill(max(self.block_size, len(self.buf) - self.pos)):
+                    raise
+                continue
+            # A number may continue in the next block
+            if end == len(self.buf) and not self.eof and not isinstance(value, (dict, list, str)):
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_features(fileobj, block_size: int = BLOCK_SIZE, progress=None):
+    """Yield GeoJSON feature dicts from a file object one at a time.
+
+    Accepts a FeatureCollection, a single Feature or a bare geometry.
+    ``progress(bytes_read)`` is called after every block read.
+    """
+    stream = _Stream(fileobj, block_size, progress)
+    stream.expect("{")
+    members = {}
+    saw_features = False
+    while stream.peek() != "}":
+        if members or saw_features:
+            stream.expect(",")
+        key = stream.value()
+        stream.expect(":")
+        if key == "features":
+            saw_features = True
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.pos += 1
+                continue
+            while True:
+                yield stream.value()
+                if stream.peek() == "]":
+                    stream.pos += 1
+                    break
+                stream.expect(",")
+        else:
+            members[key] = stream.value()
+    stream.expect("}")
+
+    if not saw_features:
+        if members.get("type") == "Feature":
+            yield members
+        elif members.get("type") in GEOMETRY_TYPES:
+            yield {"type": "Feature", "properties": {}, "geometry": members}
+        else:
+            raise ValueError(f"Invalid GeoJSON: unsupported type {members.get('type')!r}")
+
+
+def read_feature_batches(fileobj, batch_size: int = BATCH_SIZE, block_size: int = BLOCK_SIZE, progress=None):
+    """Yield GeoDataFrames (EPSG:4326) of at most ``batch_size`` features."""
+    batch = []
+    for feature in iter_features(fileobj, block_size, progress):
+        batch.append(feature)
+        if len(batch) >= batch_size:
+            yield gpd.GeoDataFrame.from_features(batch, crs="EPSG:4326")
+            batch = []
+    if batch:
+        yield gpd.GeoDataFrame.from_features(batch, crs="EPSG:4326")
@@ -0,0 +1,183 @@
+"""
+Prefix-aware set algebra on geohash lists.
+
+A geohash of precision ``p`` is the half-open range ``[start, start + 32**(12 - p))``
+of full-precision cells, where ``start`` is its 60-bit value (see
+:func:`~geohash_converter.decode.geohashes_to_int`). Two cells either nest
+or are disjoint, so a parent covers all of its children whatever the
+precisions in a list.
+
+Inputs are geohash strings or their int64 keys (from
+:func:`~geohash_converter.decode.geohashes_to_int` or
+:func:`~geohash_converter.validate.tokenize_geohash_keys`, which skips the
+string step for large pastes). Every operation sorts the ranges once and
+answers "is this cell covered by / does it overlap the other list" with
+binary searches over the other list's merged ranges, so union,
+intersection and difference run in ``O(n log n)``. Results keep the input cells where possible; only cells of
+the first list partly cut by :func:`geohash_difference` are split into the
+fewest aligned cells of the remainder. Results never contain a cell
+together with one of its descendants.
+"""
+
+import numpy as np
+
+from geohash_converter.decode import _SIGN, MAX_PRECISION, geohashes_to_int, int_to_geohashes
+
+
+def _keys(geohashes):
+    if isinstance(geohashes, np.ndarray) and geohashes.dtype == np.int64:
+        return geohashes
+    return geohashes_to_int(list(geohashes))
+
+
+def _ranges(geohashes):
+    """``(start, end, precision)`` int64 arrays of every geohash."""
+    value = _keys(geohashes).view(np.uint64) ^ _SIGN
+    precision = (value & np.uint64(15)).astype(np.int64)
+    start = (value >> np.uint64(4)).astype(np.int64)
+    return start, start + (np.int64(1) << (5 * (MAX_PRECISION - precision))), precision
+
+
+def _to_geohashes(start, precision):
+    value = (start.astype(np.uint64) << np.uint64(4)) | precision.astype(np.uint64)
+    return int_to_geohashes((value ^ _SIGN).view(np.int64))
+
+
+def _normalize(start, end, precision):
+    """Sort by start and drop cells inside another cell of the same list."""
+    # Start, then coarsest first: the order of the geohash keys themselves
+    order = np.argsort((start.astype(np.uint64) << np.uint64(4)) | precision.astype(np.uint64))
+    start, end, precision = start[order], end[order], precision[order]
+    reach = np.maximum.accumulate(end)
+    inside = np.zeros(len(start), dtype=bool)
+    inside[1:] = reach[:-1] >= end[1:]
+    keep = ~inside
+    return start[keep], end[keep], precision[keep]
+
+
+def _merge(start, end):
+    """Disjoint sorted ranges covering the normalized cells ``start``/``end``."""
+    if start.size == 0:
+        return start, end
+    gap = np.ones(len(start), dtype=bool)
+    gap[1:] = start[1:] > end[:-1]
+    first = np.flatnonzero(gap)
+    last = np.append(first[1:], len(start)) - 1
+    return start[first], end[last]
+
+
+def _covered(start, end, merged):
+    """Which cells lie entirely inside the merged ranges."""
+    m_start, m_end = merged
+    i = np.searchsorted(m_start, start, side="right") - 1
+    hit = i >= 0
+    hit[hit] = m_end[i[hit]] >= end[hit]
+    return hit
+
+
+def _overlaps(start, end, merged):
+    """Which cells share at least one full-precision cell with the merged ranges."""
+    m_start, m_end = merged
+    # Ranges starting before the cell's end; the last of them overlaps iff it ends after the start
+    i = np.searchsorted(m_start, end, side="left") - 1
+    hit = i >= 0
+    hit[hit] = m_end[i[hit]] > start[hit]
+    return hit
+
+
+def _subtract(start, end, merged):
+    """Disjoint ranges of ``[start, end)`` cells (disjoint, sorted) minus ``merged``."""
+    m_start, m_end = merged
+    points = np.concatenate((start, end, m_start, m_end))
+    a = np.concatenate((np.ones(len(start)), -np.ones(len(end)), np.zeros(2 * len(m_start)))).astype(np.int64)
+    b = np.concatenate((np.zeros(2 * len(start)), np.ones(len(m_start)), -np.ones(len(m_end)))).astype(np.int64)
+    points, inverse = np.unique(points, return_inverse=True)
+    in_a = np.cumsum(np.bincount(inverse, weights=a, minlength=len(points))) > 0
+    in_b = np.cumsum(np.bincount(inverse, weights=b, minlength=len(points))) > 0
+    keep = in_a & ~in_b
+    # keep[i] describes [points[i], points[i + 1])
+    begin = keep & ~np.concatenate(([False], keep[:-1]))
+    finish = keep & ~np.concatenate((keep[1:], [False]))
+    return points[begin], points[np.flatnonzero(finish) + 1]
+
+
+def _repeat_ranges(lo, hi):
+    """Concatenation of ``arange(lo[i], hi[i])`` and the range number of each value."""
+    counts = np.maximum(hi - lo, 0)
+    owner = np.repeat(np.arange(len(lo)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return lo[owner] + offsets, owner
+
+
+def _decompose(start, end):
+    """Fewest aligned cells (geohashes of any precision) tiling each range."""
+    starts, precisions = [], []
+    parent_lo = parent_hi = None
+    for p in range(1, MAX_PRECISION + 1):
+        size = np.int64(1) << (5 * (MAX_PRECISION - p))
+        lo = -(-start // size)
+        hi = end // size
+        if parent_lo is None:
+            pieces = [(lo, hi)]
+        else:
+            # Cells inside a whole parent were already emitted one level up
+            has_parent = parent_hi > parent_lo
+            pieces = [
+                (lo, np.where(has_parent, parent_lo * 32, hi)),
+                (np.where(has_parent, parent_hi * 32, hi), hi),
+            ]
+        for a, b in pieces:
+            index, _ = _repeat_ranges(a, b)
+            starts.append(index * size)
+            precisions.append(np.full(len(index), p, dtype=np.int64))
+        parent_lo, parent_hi = lo, hi
+    return np.concatenate(starts), np.concatenate(precisions)
+
+
+def _result(start, precision):
+    order = np.argsort(start, kind="stable")
+    return _to_geohashes(start[order], precision[order]).tolist()
+
+
+def geohash_union(a, b) -> list:
+    """Cells of either list, without cells covered by a coarser one. Sorted."""
+    start, end, precision = _normalize(*(np.concatenate(x) for x in zip(_ranges(a), _ranges(b))))
+    return _result(start, precision)
+
+
+def geohash_intersection(a, b) -> list:
+    """The area covered by both lists, as the finer of every nested pair. Sorted."""
+    a_start, a_end, a_precision = _normalize(*_ranges(a))
+    b_start, b_end, b_precision = _normalize(*_ranges(b))
+    in_b = _covered(a_start, a_end, _merge(b_start, b_end))
+    in_a = _covered(b_start, b_end, _merge(a_start, a_end))
+    start, end, precision = _normalize(
+        np.concatenate((a_start[in_b], b_start[in_a])),
+        np.concatenate((a_end[in_b], b_end[in_a])),
+        np.concatenate((a_precision[in_b], b_precision[in_a])),
+    )
+    return _result(start, precision)
+
+
+def geohash_difference(a, b) -> list:
+    """The area of ``a`` not covered by ``b``. Sorted.
+
+    Cells of ``a`` untouched by ``b`` are kept as they are; cells partly
+    covered are split into the fewest finer cells of what remains.
+    """
+    a_start, a_end, a_precision = _normalize(*_ranges(a))
+    merged = _merge(*_normalize(*_ranges(b))[:2])
+    touched = _overlaps(a_start, a_end, merged)
+    rest_start, rest_end = _subtract(a_start[touched], a_end[touched], merged)
+    split_start, split_precision = _decompose(rest_start, rest_end)
+    return _result(
+        np.concatenate((a_start[~touched], split_start)),
+        np.concatenate((a_precision[~touched], split_precision)),
+    )
+
+
+OPERATIONS = {
+    "union": geohash_union,
+    "intersection": geohash_intersection,
+    "difference": geohash_difference,
+}
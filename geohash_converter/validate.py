@@ -0,0 +1,129 @@
+"""
+Vectorized tokenizing and validation of pasted geohashes.
+
+:func:`tokenize_geohashes` scans the pasted text as bytes: every byte is
+classified through a 256-entry lookup table (geohash character, separator
+or other), token boundaries come from the separator mask and a token is
+valid when it is 1-12 bytes long and holds no "other" byte. Text is
+processed in chunks cut at a separator. Valid tokens are packed straight
+into the sortable integers of :func:`~geohash_converter.decode.geohashes_to_int`
+and, after every chunk, merged into one sorted array of the unique values
+seen so far (with the position of their first occurrence), so memory beyond
+the input text grows with the number of unique geohashes only.
+
+:func:`validate_geohashes` applies the same rules to a Series of values.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from geohash_converter.decode import _LUT, _SIGN, BASE32, MAX_PRECISION, int_to_geohashes
+
+_OTHER, _VALID, _SEP = 0, 1, 2
+_CLASS = np.zeros(256, dtype=np.uint8)
+_CLASS[np.frombuffer(BASE32.encode("ascii"), dtype=np.uint8)] = _VALID
+# Same separators as re.sub(r"[;\s]+", ",") plus the comma itself
+_CLASS[[i for i in range(128) if chr(i).isspace() or chr(i) in ",;"]] = _SEP
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+TOKEN_CHUNK = 1 << 23  # bytes of text per vectorized pass
+
+
+def _ascii_bytes(text):
+    if text.isascii():
+        return text.encode("ascii")
+    # Unicode whitespace still separates tokens; any other non-ASCII
+    # character makes its token invalid (NUL is classed as "other").
+    return _NON_ASCII.sub(lambda m: " " if m.group().isspace() else "\x00", text).encode("ascii")
+
+
+def _chunk_tokens(part, cls, skip_first):
+    """Valid tokens of one chunk as geohash integers, and their offsets."""
+    token = np.concatenate(([False], cls != _SEP, [False])).view(np.int8)
+    edges = np.diff(token)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if skip_first and starts.size and starts[0] == 0:
+        starts, ends = starts[1:], ends[1:]
+    bad = np.concatenate(([0], np.cumsum(cls == _OTHER)))
+    keep = (ends - starts <= MAX_PRECISION) & (bad[ends] == bad[starts])
+    starts, lengths = starts[keep], (ends - starts)[keep]
+
+    # Pack column by column, same layout as geohashes_to_int
+    value = np.zeros(starts.size, dtype=np.uint64)
+    for j in range(MAX_PRECISION):
+        inside = lengths > j
+        code = np.zeros(starts.size, dtype=np.uint64)
+        code[inside] = _LUT[part[starts[inside] + j]]
+        value = (value << np.uint64(5)) | code
+    value = (value << np.uint64(4)) | lengths.astype(np.uint64)
+    return (value ^ _SIGN).view(np.int64), starts
+
+
+def _tokenize(text, chunk_size):
+    """Sorted unique int64 keys of the valid tokens and their first offsets."""
+    seen = np.array([], dtype=np.int64)
+    first = np.array([], dtype=np.int64)
+    if not text:
+        return seen, first
+    buf = np.frombuffer(_ascii_bytes(text.lower()), dtype=np.uint8)
+    # A window always holds a whole valid token plus its separator
+    chunk_size = max(chunk_size, MAX_PRECISION + 1)
+    pos, n, carry = 0, buf.size, False
+    while pos < n:
+        end = min(pos + chunk_size, n)
+        part = buf[pos:end]
+        cls = _CLASS[part]
+        if end < n:
+            seps = np.flatnonzero(cls == _SEP)
+            if seps.size == 0:
+                # Inside one oversized (hence invalid) token
+                pos, carry = end, True
+                continue
+            cut = int(seps[-1]) + 1
+            part, cls, end = part[:cut], cls[:cut], pos + cut
+        tokens, offsets = _chunk_tokens(part, cls, carry)
+        # Earlier occurrences come first, so np.unique keeps their position
+        seen, index = np.unique(np.concatenate((seen, tokens)), return_index=True)
+        first = np.concatenate((first, offsets + pos))[index]
+        pos, carry = end, False
+    return seen, first
+
+
+def tokenize_geohashes(text: str, chunk_size: int = TOKEN_CHUNK) -> list:
+    """Extract valid, unique geohashes from free text in input order.
+
+    Text is lowercased; whitespace, ``,`` and ``;`` separate tokens; tokens
+    that are not 1-12 geohash base32 characters are dropped.
+    """
+    seen, first = _tokenize(text, chunk_size)
+    return int_to_geohashes(seen[np.argsort(first)]).tolist()
+
+
+def tokenize_geohash_keys(text: str, chunk_size: int = TOKEN_CHUNK):
+    """Like :func:`tokenize_geohashes` but returns the sorted unique int64 keys.
+
+    See :func:`~geohash_converter.decode.geohashes_to_int`; skips building
+    strings when the result feeds integer-key code such as
+    :mod:`~geohash_converter.setops`.
+    """
+    return _tokenize(text, chunk_size)[0]
+
+
+def validate_geohashes(s: pd.Series) -> pd.Series:
+    """Strip and lowercase ``s`` and keep only valid geohashes.
+
+    The index of kept rows is preserved and duplicates are not removed.
+    """
+    s = s.astype(str).str.strip().str.lower()
+    lengths = s.str.len().to_numpy()
+    ok = (lengths >= 1) & (lengths <= MAX_PRECISION)
+    if ok.any():
+        codes = s[ok].to_numpy(dtype=f"U{MAX_PRECISION}").view(np.uint32).reshape(-1, MAX_PRECISION)
+        valid = _CLASS[np.minimum(codes, 255)] == _VALID
+        valid &= codes < 128
+        padding = np.arange(MAX_PRECISION) >= lengths[ok][:, None]
+        ok[ok] = (valid | padding).all(axis=1)
+    return s[ok]
@@ -0,0 +1,307 @@
+import json
+
+import numpy as np
+from jinja2 import Template
+
+from folium.map import Layer
+from folium.plugins import MarkerCluster
+
+from geohash_converter.decode import decode_bounds
+
+
+class GeohashLayer(Layer):
+    """
+    Leaflet layer that draws geohash cells in the browser.
+
+    Only the geohash strings are embedded in the page (as one comma separated
+    string); every cell is decoded to its rectangle in JavaScript and drawn on
+    a shared canvas renderer. Compared with sending polygon GeoJSON this keeps
+    the payload to a few bytes per cell.
+
+    Parameters
+    ----------
+    geohashes : iterable of str
+        Geohash cells to draw, any mix of precisions.
+    name : string, default None
+        The name of the layer, as it will appear in LayerControls.
+    color : str, default '#3388ff'
+        Stroke and fill colour used when ``colors`` has no entry for a cell.
+    colors : dict, optional
+        Mapping of precision (geohash length) to colour.
+    weight : int, default 2
+        Stroke width in pixels.
+    opacity : float, default 1.0
+        Stroke opacity.
+    fill : bool, default False
+        Whether to fill the cells. Unfilled cells keep a transparent fill so
+        hovering anywhere inside still shows the tooltip.
+    fill_opacity : float, default 0.25
+        Fill opacity, used when ``fill`` is True.
+    tooltip : bool, default True
+        Show the geohash and its precision when hovering a cell.
+    overlay : bool, default True
+        Adds the layer as an optional overlay.
+    control : bool, default True
+        Whether the layer will be included in LayerControls.
+    show : bool, default True
+        Whether the layer will be shown on opening.
+
+    Examples
+    --------
+    >>> m = folium.Map()
+    >>> GeohashLayer(["qqguyu7", "qqguyur"], name="Geohash Cells").add_to(m)
+
+    """
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function() {
+                var BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz";
+                var style = {{ this.style|tojson }};
+                var colors = {{ this.colors|tojson }};
+                var cells = {{ this.payload|tojson }};
+                var renderer = L.canvas({padding: 0.5});
+                var group = L.featureGroup();
+
+                function bbox(gh) {
+                    var even = true, lat = [-90.0, 90.0], lon = [-180.0, 180.0];
+                    for (var i = 0; i < gh.length; i++) {
+                        var cd = BASE32.indexOf(gh.charAt(i));
+                        for (var mask = 16; mask >= 1; mask >>= 1) {
+                            var r = even ? lon : lat;
+                            var mid = (r[0] + r[1]) / 2;
+                            if (cd & mask) { r[0] = mid; } else { r[1] = mid; }
+                            even = !even;
+                        }
+                    }
+                    return [[lat[0], lon[0]], [lat[1], lon[1]]];
+                }
+
+                cells = cells ? cells.split(",") : [];
+                for (var i = 0; i < cells.length; i++) {
+                    var gh = cells[i];
+                    var col = colors[gh.length] || style.color;
+                    var rect = L.rectangle(bbox(gh), {
+                        renderer: renderer,
+                        color: col,
+                        fillColor: col,
+                        weight: style.weight,
+                        opacity: style.opacity,
+                        fill: true,
+                        fillOpacity: style.fillOpacity,
+                    });
+                    rect.geohash = gh;
+                    group.addLayer(rect);
+                }
+
+                {%- if this.tooltip %}
+                group.bindTooltip(function(layer) {
+                    return "geohash: " + layer.geohash + " | precision: " + layer.geohash.length;
+                }, {sticky: true});
+                {%- endif %}
+                group.on("mouseover", function(e) {
+                    e.layer.setStyle({weight: style.weight + 1});
+                });
+                group.on("mouseout", function(e) {
+                    e.layer.setStyle({weight: style.weight});
+                });
+                return group;
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(
+        self,
+        geohashes,
+        name=None,
+        color="#3388ff",
+        colors=None,
+        weight=2,
+        opacity=1.0,
+        fill=False,
+        fill_opacity=0.25,
+        tooltip=True,
+        overlay=True,
+        control=True,
+        show=True,
+    ):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = "GeohashLayer"
+        self.payload = ",".join(str(g) for g in geohashes)
+        self.colors = {int(k): v for k, v in (colors or {}).items()}
+        self.style = {
+            "color": color,
+            "weight": weight,
+            "opacity": opacity,
+            "fillOpacity": fill_opacity if fill else 0.0,
+        }
+        self.tooltip = tooltip
+
+
+class GeohashCentroidCluster(MarkerCluster):
+    """
+    Clustered markers at the centres of geohash cells, built in the browser.
+
+    All centres are computed at once from the decoded cell bounds and sent
+    as one flat ``[lat, lon, lat, lon, ...]`` array next to the comma
+    separated geohashes; the markers are created in JavaScript and added to
+    the cluster in a single ``addLayers`` call, so no Python object exists
+    per marker.
+
+    Parameters
+    ----------
+    geohashes : iterable of str
+        Geohash cells, any mix of precisions.
+    name : string, default None
+        The name of the layer, as it will appear in LayerControls.
+    tooltip : bool, default True
+        Show the geohash and its precision when hovering a marker.
+    overlay : bool, default True
+        Adds the layer as an optional overlay.
+    control : bool, default True
+        Whether the layer will be included in LayerControls.
+    show : bool, default True
+        Whether the layer will be shown on opening.
+    options : dict, optional
+        Options for Leaflet.markercluster; ``chunkedLoading`` is on by default.
+
+    Examples
+    --------
+    >>> m = folium.Map()
+    >>> GeohashCentroidCluster(["qqguyu7", "qqguyur"], name="Centroids").add_to(m)
+
+    """
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function() {
+                var coords = {{ this.coords|tojson }};
+                var cells = {{ this.payload|tojson }};
+                cells = cells ? cells.split(",") : [];
+                var cluster = L.markerClusterGroup({{ this.options|tojson }});
+                var markers = new Array(cells.length);
+                for (var i = 0; i < cells.length; i++) {
+                    var marker = L.marker([coords[2 * i], coords[2 * i + 1]]);
+                    {%- if this.tooltip %}
+                    marker.bindTooltip("geohash: " + cells[i] + " | precision: " + cells[i].length);
+                    {%- endif %}
+                    markers[i] = marker;
+                }
+                cluster.addLayers(markers);
+                return cluster;
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(
+        self,
+        geohashes,
+        name=None,
+        tooltip=True,
+        overlay=True,
+        control=True,
+        show=True,
+        options=None,
+    ):
+        super().__init__(name=name, overlay=overlay, control=control, show=show,
+                         options={"chunkedLoading": True, **(options or {})})
+        self._name = "GeohashCentroidCluster"
+        geohashes = np.asarray([str(g) for g in geohashes], dtype=str)
+        self.payload = ",".join(geohashes.tolist())
+        if geohashes.size:
+            minx, miny, maxx, maxy = decode_bounds(geohashes)
+            centres = np.column_stack(((miny + maxy) / 2, (minx + maxx) / 2))
+            self.coords = np.round(centres, 7).ravel().tolist()
+        else:
+            self.coords = []
+        self.tooltip = tooltip
+
+
+class GeoJsonOutline(Layer):
+    """
+    GeoJSON layer drawn with one shared style.
+
+    Unlike ``folium.GeoJson`` with a ``style_function``, no Python callback
+    runs per feature: the style is a single object handed to ``L.geoJson``
+    and the tooltip is bound once on the layer.
+
+    Parameters
+    ----------
+    data : dict, str or object with ``__geo_interface__``
+        GeoJSON FeatureCollection, Feature or geometry (a GeoDataFrame works).
+    name : string, default None
+        The name of the layer, as it will appear in LayerControls.
+    color : str, default 'red'
+        Stroke colour.
+    weight : int, default 4
+        Stroke width in pixels.
+    opacity : float, default 1.0
+        Stroke opacity.
+    fill : bool, default True
+        Whether to fill the shapes.
+    fill_opacity : float, default 0.2
+        Fill opacity.
+    tooltip_fields : list of str, optional
+        Feature properties shown when hovering.
+    overlay : bool, default True
+        Adds the layer as an optional overlay.
+    control : bool, default True
+        Whether the layer will be included in LayerControls.
+    show : bool, default True
+        Whether the layer will be shown on opening.
+
+    Examples
+    --------
+    >>> m = folium.Map()
+    >>> GeoJsonOutline(gdf, name="geojson", tooltip_fields=["id"]).add_to(m)
+
+    """
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = L.geoJson({{ this.data|tojson }}, {
+                style: {{ this.style|tojson }},
+            });
+            {%- if this.tooltip_fields %}
+            {{ this.get_name() }}.bindTooltip(function(layer) {
+                var props = layer.feature.properties || {};
+                return {{ this.tooltip_fields|tojson }}.map(function(key) {
+                    return key + ": " + props[key];
+                }).join("<br>");
+            }, {sticky: true});
+            {%- endif %}
+        {% endmacro %}
+        """
+    )
+
+    def __init__(
+        self,
+        data,
+        name=None,
+        color="red",
+        weight=4,
+        opacity=1.0,
+        fill=True,
+        fill_opacity=0.2,
+        tooltip_fields=None,
+        overlay=True,
+        control=True,
+        show=True,
+    ):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = "GeoJsonOutline"
+        if hasattr(data, "to_json"):
+            data = data.to_json()
+        elif hasattr(data, "__geo_interface__"):
+            data = data.__geo_interface__
+        self.data = json.loads(data) if isinstance(data, str) else data
+        self.style = {
+            "color": color,
+            "weight": weight,
+            "opacity": opacity,
+            "fill": fill,
+            "fillOpacity": fill_opacity,
+        }
+        self.tooltip_fields = list(tooltip_fields or [])
@@ -1,12 +1,88 @@
 import folium
 import geopandas as gpd
+import io
 import json
 import numpy as np
+import pandas as pd
 import streamlit as st
-from polygeohasher import polygeohasher
+from geohash_converter import geohashes_to_geometry, jobs
+from geohash_converter.batch import geohash_table
+from geohash_converter.budget import CellBudgetExceeded, cell_limit, estimate_table, suggest_precision
+from geohash_converter.cache import export_cache
+from geohash_converter.decode import MAX_PRECISION
+from geohash_converter.export import BINARY_FORMATS, binary_export, csv_chunks, export_bytes, geojson_chunks
+from geohash_converter.profiling import StageProfiler
+from geohash_converter.reader import read_feature_batches
 from shapely.geometry import Polygon
 from shapely import wkt
 from streamlit_folium import st_folium
+from geohashlayer import GeoJsonOutline, GeohashLayer
+
+# Per-stage instrumentation, enabled with GEOHASH_PROFILE=1
+prof = StageProfiler("Bulk_Extraction")
+
+
+def cover_upload(job, data, number, compact_output, limit):
+  """Background job: stream-cover the upload, then decode the cells.
+
+  The upload is read in batches of features and every batch is covered
+  (each feature on its own, in a process pool) before the next is parsed.
+  Only outlines simplified to the cell size are kept for the map.
+  """
+  total_mb = max(len(data), 1) / 2**20
+  read_mb = batch_start_mb = 0.0
+  covered = 0
+  def on_read(bytes_read):
+    nonlocal read_mb
+    read_mb = bytes_read / 2**20
+
+  def on_cover(done, total):
+    # Features covered in this batch move the bar across the bytes it was read from
+    mb = batch_start_mb + (read_mb - batch_start_mb) * done / max(total, 1)
+    job.report(0.9 * min(mb / total_mb, 1.0),
+               f"Covered {covered + done:,} features ({read_mb:.0f}/{total_mb:.0f} MB read)")
+
+  tolerance = 180 / 2 ** (5 * max(number, 1) // 2) / 2
+  tables, outlines = [], []
+  minx = miny = np.inf
+  maxx = maxy = -np.inf
+  used = 0
+  for batch in read_feature_batches(io.BytesIO(data), progress=on_read):
+    bx0, by0, bx1, by1 = batch.total_bounds
+    minx, miny, maxx, maxy = min(minx, bx0), min(miny, by0), max(maxx, bx1), max(maxy, by1)
+    # The cover stops as soon as the whole file passes the limit; a cancel
+    # interrupts it inside a feature (check) or while waiting on the pool
+    with job.phase("cover"):
+      tables.append(geohash_table(batch, number, compact=compact_output, column="geohash_list",
+                                  progress=on_cover, max_cells=limit - used, check=job.report))
+    used += len(tables[-1])
+    covered += len(batch)
+    batch_start_mb = read_mb
+    with job.phase("simplify_outlines"):
+      outlines.append(batch.set_geometry(batch.geometry.simplify(tolerance)))
+  if not tables:
+    return None
+  job.report(0.9, f"Decoding {used:,} cells")
+  with job.phase("decode"):
+    geohash_gdf = pd.concat(tables, ignore_index=True)
+    geohash_gdf_list = geohashes_to_geometry(geohash_gdf, "geohash_list")
+  return {
+    "cells": gpd.GeoDataFrame(geohash_gdf_list, geometry=geohash_gdf_list['geometry'], crs="EPSG:4326"),
+    "outlines": gpd.GeoDataFrame(pd.concat(outlines, ignore_index=True), crs="EPSG:4326"),
+    "center": [(miny + maxy) / 2, (minx + maxx) / 2],
+  }
+
+
+@st.fragment(run_every=0.5)
+def job_progress(job_id):
+  """Poll a running job; the whole page reruns once it has finished."""
+  job = jobs.get(job_id)
+  if job is None or job.done():
+    st.rerun()
+  st.progress(job.progress, text=job.message or "Waiting for a worker...")
+  if st.button("Cancel", key=f"cancel_{job_id}"):
+    job.cancel()
+    st.rerun()
 
 try:
   CENTER_START = [-6.189991467509655, 106.84617273604809]
@@ -15,65 +91,100 @@ try:
   if "center" not in st.session_state:
     st.session_state["center"] = [-6.189991467509655, 106.84617273604809]
 
-  uploaded_files = st.file_uploader("Choose a Geojson file And Please dissolve the Files into single polygon/attribute, Other than that will cause major ERROR!!", accept_multiple_files=False)
-  button = st.number_input('Insert a Geohash number')
+  uploaded_files = st.file_uploader("Choose a Geojson file (single polygon or many features, each feature is covered separately)", accept_multiple_files=False)
+  button = st.number_input('Insert a Geohash number', min_value=1, max_value=MAX_PRECISION, value=None, step=1)
   number = int(button)
-
-
-
-  gdf = gpd.read_file(uploaded_files)
-  gpd_geom = gpd.GeoDataFrame(gdf, geometry=gdf['geometry'], crs="EPSG:4326")
+  compact_output = st.checkbox("Compact output (merge complete groups of 32 cells into their parent)", value=False)
+
+
+
+  # Predict the cover size per precision in a first pass over the upload
+  # (no covering) and refuse precisions above the hard limit
+  # (GEOHASH_MAX_CELLS) before any cell is computed.
+  limit = cell_limit()
+  if st.session_state.get("bulk_estimate", (None, None))[0] != uploaded_files.file_id:
+    uploaded_files.seek(0)
+    estimate = None
+    with prof.stage("estimate_cells") as stage:
+      for batch in read_feature_batches(uploaded_files):
+        part = estimate_table(batch.geometry)
+        estimate = part if estimate is None else estimate.assign(cells=estimate["cells"] + part["cells"])
+      stage.output = estimate
+    st.session_state["bulk_estimate"] = (uploaded_files.file_id, estimate)
+  estimate = st.session_state["bulk_estimate"][1]
+  if estimate is None:
+    st.warning("The uploaded file has no features.")
+    st.stop()
+  expected = int(estimate.loc[estimate["precision"] == number, "cells"].iloc[0])
+  suggestion = suggest_precision(estimate, limit)
+  if expected > limit:
+    st.error(
+      f"Precision {number} would need ~{expected:,} cells, above the limit of {limit:,}. "
+      + (f"Use precision {suggestion} or lower." if suggestion else "Split the file into smaller areas.")
+    )
+    st.dataframe(estimate, hide_index=True)
+    st.stop()
+  st.caption(f"Estimated cells: ~{expected:,} (limit {limit:,}, finest precision within it: {suggestion})")
+
+  # Cover and decode run as a background job on the shared worker pool;
+  # the page polls its progress and can cancel it. Changing the file or the
+  # options cancels the running job instead of queueing behind it.
+  key = (uploaded_files.file_id, number, compact_output, limit)
+  # The upload is only copied when a new job is submitted
+  job = jobs.get(st.session_state.get("bulk_job"))
+  if job is None or job.key != key:
+    job = jobs.ensure(st.session_state, "bulk_job", key, cover_upload, uploaded_files.getvalue(), number, compact_output, limit)
+  if job.status == "failed":
+    if isinstance(job.error, CellBudgetExceeded):
+      st.error(f"Cover stopped: more than {limit:,} cells at precision {number}. Use a coarser precision.")
+    else:
+      st.error(f"Cover failed: {job.error}")
+    st.stop()
+  if job.status == "cancelled":
+    st.warning("Cover cancelled.")
+    if st.button("Run again"):
+      st.session_state.pop("bulk_job", None)
+      st.rerun()
+    st.stop()
+  if job.status != "done":
+    job_progress(job.id)
+    st.stop()
+  # The job's phases (cover, decode, ...) go into the profile once, on the first rerun after it finished
+  if st.session_state.get("profiled_job") != job.id:
+    st.session_state["profiled_job"] = job.id
+    for name, seconds in job.timings.items():
+      prof.record(name, seconds)
+  if job.result is None:
+    st.warning("The uploaded file has no features.")
+    st.stop()
+  gpd_geom = job.result["outlines"]
+  gpd_geohash_geom = job.result["cells"]
   geojson=gpd_geom.to_json()
 
-  gpd_geom['Center_point'] = gpd_geom['geometry'].centroid
-  gpd_geom["lat"] = gpd_geom.Center_point.map(lambda p: p.y)
-  gpd_geom["long"] = gpd_geom.Center_point.map(lambda p: p.x)
-
-  try:
-    latitude = float(gpd_geom["lat"])
-    longitude = float(gpd_geom["long"])
-  except ValueError:
-    latitude = None
-    longitude = None
-
-  if latitude is None or longitude is None:
-    st.error("Invalid latitude or longitude value. Please enter valid latitude and longitude values separated by a comma.")
-  else:
-    st.success("Successfully converted latitude and longitude values to float.")
-
-  st.session_state["center"] = [latitude, longitude]
-
-  geohash_gdf = polygeohasher.create_geohash_list(gdf, number,inner=False)
-  geohash_gdf_list = polygeohasher.geohashes_to_geometry(geohash_gdf,"geohash_list")
-  gpd_geohash_geom = gpd.GeoDataFrame(geohash_gdf_list, geometry=geohash_gdf_list['geometry'], crs="EPSG:4326")
-  geojson_geohash = gpd_geohash_geom.to_json()
+  # Center on the bounding box of all features instead of a single centroid
+  st.success(f"Loaded {len(gpd_geom)} feature(s).")
+  st.session_state["center"] = job.result["center"]
+  st.caption(f"Total cells: {len(gpd_geohash_geom)} | Unique geohash: {gpd_geohash_geom['geohash_list'].nunique()}")
 
   m = folium.Map(location=st.session_state["center"],zoom_start=12)
-  folium.GeoJson(
-      geojson, 
-      name="geojson",
-      style_function = lambda x: {
-          'color': 'red',
-          'weight': 4,
-          'interactive' : True
-      }).add_to(m)
+  # One shared style for all outlines; no per-feature style callback
+  GeoJsonOutline(geojson, name="geojson", color='red', weight=4).add_to(m)
   fg = folium.FeatureGroup(name="Geohash")
-  fg.add_child(folium.features.GeoJson(geojson_geohash,
-                                      tooltip = folium.GeoJsonTooltip(fields = ['geohash_list']), 
-                                      style_function = lambda x:{
-                                            'color': 'blue'                                          
-                                      })).add_to(m)
+  fg.add_child(GeohashLayer(gpd_geohash_geom['geohash_list'].unique(), color='blue', control=False)).add_to(m)
 
   tiles = ['Cartodb Positron','openstreetmap','Cartodb dark_matter']
   for tile in tiles:
     folium.TileLayer(tile).add_to(m)
 
   folium.LayerControl().add_to(m)
-  st_folium(m, width=1200, height=800)
+  with prof.stage("st_folium") as stage:
+    stage.output = m
+    st_folium(m, width=1200, height=800)
 
 
 
-  csv=gpd_geohash_geom.to_csv()
+  with prof.stage("export_csv") as stage:
+    csv = stage.output = export_bytes(csv_chunks(gpd_geohash_geom))
   st.download_button(
       label="Download data as CSV",
       data=csv,
@@ -81,13 +192,34 @@ try:
       mime='text/csv',
   )
 
-  file_geojson = gpd_geohash_geom.to_json()
+  with prof.stage("export_geojson") as stage:
+    file_geojson = stage.output = export_bytes(geojson_chunks(gpd_geohash_geom, geohash_column="geohash_list"))
   st.download_button(
       label="Download data as JSON",
       data=file_geojson,
       file_name='geohash_file.geojson',
   )
+
+  binary_fmt = st.selectbox("Binary format", list(BINARY_FORMATS))
+  with_int = st.checkbox("Add integer-encoded geohash column (int64)", value=True)
+  extension, mime = BINARY_FORMATS[binary_fmt]
+  with prof.stage(f"export_{binary_fmt}") as stage:
+    # Built once per job and format; later reruns reuse the stored bytes
+    binary_bytes = stage.output = export_cache.get_or_compute(
+        ("binary", job.id, binary_fmt, with_int),
+        lambda: binary_export(gpd_geohash_geom, binary_fmt, geohash_column="geohash_list", with_int=with_int),
+    )
+  st.download_button(
+      label=f"Download data as {binary_fmt}",
+      data=binary_bytes,
+      file_name='geohash_file' + extension,
+      mime=mime,
+  )
 except (TypeError, NameError, AttributeError):
   pass
 
-
+if prof.enabled:
+  with st.expander("Debug: per-stage time, memory and output size", expanded=False):
+    st.dataframe(prof.frame(), use_container_width=True)
+    st.caption(f"Rerun {prof.rerun_id}, logged to {prof.log_path}")
+  prof.flush()
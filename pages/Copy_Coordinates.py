@@ -1,12 +1,18 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import geopandas as gpd
-from polygeohasher import polygeohasher
-from shapely.geometry import Polygon
+from geohash_converter import create_geohash_list, geohashes_to_geometry
+from geohash_converter.cache import export_cache
+from geohash_converter.export import BINARY_FORMATS, binary_export, csv_chunks, export_bytes, geojson_chunks
+from geohash_converter.polygons import parse_polygons
+from geohash_converter.profiling import StageProfiler
 from shapely import wkt
 import folium
 from streamlit_folium import st_folium
+from geohashlayer import GeoJsonOutline, GeohashLayer
+
+# Per-stage instrumentation, enabled with GEOHASH_PROFILE=1
+prof = StageProfiler("Copy_Coordinates")
 
 try:
      CENTER_START = [-6.175337169759785, 106.82713616185086]
@@ -15,78 +21,73 @@ try:
           st.session_state["center"] = [-6.175337169759785, 106.82713616185086]
 
 
-     coordinates = st.text_input("PLease enter coordinates","-6.171046259577523, 106.82269788734317 ,-6.180712281012674, 106.8225072511238 ,-6.180295319024069, 106.83230595281657 ,-6.170894634306194, 106.82952266400855 ,-6.171046259577523, 106.82269788734317")
-     list = [float(x) for x in coordinates.split(',')]
-
-     longitude = []
-     latitude = []
-
-     for i in range(len(list)):
-          if i % 2 == 0:
-               latitude.append(list[i])
-          else: 
-               longitude.append(list[i])
-     df = pd.DataFrame(columns=['latitude','longitude'])
-     df['latitude'] = latitude
-     df['longitude'] = longitude
-     df['Name']="polygon"
-     df['points'] = gpd.points_from_xy(df.longitude, df.latitude)
-     df_geom = df.groupby('Name').agg(geometry = pd.NamedAgg(column='points', aggfunc = lambda x: Polygon(x.values))).reset_index()
-     gpd_geom = gpd.GeoDataFrame(df_geom, geometry=df_geom['geometry'], crs="EPSG:4326")
-     geojson=gpd_geom.to_json()
-
-
+     # Many polygons at once: "lat, lon, ..." blocks separated by a blank line,
+     # WKT polygons, or CSV with an id column; every polygon keeps its id as Name
+     coordinates = st.text_area("Please enter coordinates (lat, lon pairs; separate polygons with a blank line), WKT polygons, or CSV with an id column","-6.171046259577523, 106.82269788734317 ,-6.180712281012674, 106.8225072511238 ,-6.180295319024069, 106.83230595281657 ,-6.170894634306194, 106.82952266400855 ,-6.171046259577523, 106.82269788734317")
      try:
-          latitude = float(df['latitude'].iloc[0])
-          longitude = float(df['longitude'].iloc[0])
-     except ValueError:
-          latitude = None
-          longitude = None
-
-     if latitude is None or longitude is None:
-          st.error("Invalid latitude or longitude value. Please enter valid latitude and longitude values separated by a comma.")
-     else:
-          st.success("Successfully converted latitude and longitude values to float.")
-
+          gpd_geom = parse_polygons(coordinates)
+     except ValueError as e:
+          st.error(f"Invalid input: {e}")
+          st.stop()
+     geojson=gpd_geom.to_json()
+     st.success(f"Parsed {len(gpd_geom)} polygon(s).")
 
-     st.session_state["center"] = [latitude, longitude]
+     minx, miny, maxx, maxy = gpd_geom.total_bounds
+     st.session_state["center"] = [(miny + maxy) / 2, (minx + maxx) / 2]
 
      button = st.number_input('Insert a Geohash number',3)
      number = int(button)
-     geohash_gdf = polygeohasher.create_geohash_list(gpd_geom, number,inner=False)
-     geohash_gdf_list = polygeohasher.geohashes_to_geometry(geohash_gdf,"geohash_list")
+     with prof.stage("create_geohash_list") as stage:
+          geohash_gdf = stage.output = create_geohash_list(gpd_geom, number,inner=False)
+     with prof.stage("geohashes_to_geometry") as stage:
+          geohash_gdf_list = stage.output = geohashes_to_geometry(geohash_gdf,"geohash_list")
      gpd_geohash_geom = gpd.GeoDataFrame(geohash_gdf_list, geometry=geohash_gdf_list['geometry'], crs="EPSG:4326")
-     geojson_geohash = gpd_geohash_geom.to_json()
 
      m = folium.Map(location=CENTER_START,zoom_start=14)
-     folium.GeoJson(
-          geojson, 
-          name="geojson",
-          style_function = lambda x: {
-          'color': 'red',
-          'weight': 4,
-          'interactive' : True
-     }).add_to(m)
-     folium.GeoJson(
-          geojson_geohash,
-          tooltip = folium.GeoJsonTooltip(fields = ['Name', 'geohash_list']),style_function = lambda x:{'color': 'blue'}).add_to(m)
+     # One shared style for all outlines; no per-feature style callback
+     GeoJsonOutline(geojson, name="geojson", color='red', weight=4, tooltip_fields=["Name"]).add_to(m)
+     GeohashLayer(gpd_geohash_geom['geohash_list'], color='blue').add_to(m)
      
-     st_data = st_folium(m, center = st.session_state["center"], width=1200, height=800)
+     with prof.stage("st_folium") as stage:
+          stage.output = m
+          st_data = st_folium(m, center = st.session_state["center"], width=1200, height=800)
 except (TypeError, NameError, AttributeError):
   pass
 
 
-csv=gpd_geohash_geom.to_csv()
+with prof.stage("export_csv") as stage:
+     csv = stage.output = export_bytes(csv_chunks(gpd_geohash_geom))
 st.download_button(
     label="Download data as CSV",
     data=csv,
     file_name='geohash_file.csv',
     mime='text/csv',
 )
-file_geojson = gpd_geohash_geom.to_json()
+with prof.stage("export_geojson") as stage:
+     file_geojson = stage.output = export_bytes(geojson_chunks(gpd_geohash_geom, geohash_column="geohash_list"))
 st.download_button(
      label="Download data as JSON",
      data=file_geojson,
      file_name='geohash_file.geojson',
   )
+binary_fmt = st.selectbox("Binary format", list(BINARY_FORMATS))
+with_int = st.checkbox("Add integer-encoded geohash column (int64)", value=True)
+extension, mime = BINARY_FORMATS[binary_fmt]
+with prof.stage(f"export_{binary_fmt}") as stage:
+     # Built once per input and format; later reruns reuse the stored bytes
+     binary_bytes = stage.output = export_cache.get_or_compute(
+          ("binary", coordinates, number, binary_fmt, with_int),
+          lambda: binary_export(gpd_geohash_geom, binary_fmt, geohash_column="geohash_list", with_int=with_int),
+     )
+st.download_button(
+     label=f"Download data as {binary_fmt}",
+     data=binary_bytes,
+     file_name='geohash_file' + extension,
+     mime=mime,
+  )
 
+if prof.enabled:
+     with st.expander("Debug: per-stage time, memory and output size", expanded=False):
+          st.dataframe(prof.frame(), use_container_width=True)
+          st.caption(f"Rerun {prof.rerun_id}, logged to {prof.log_path}")
+     prof.flush()
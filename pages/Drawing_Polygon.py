@@ -1,38 +1,141 @@
 import streamlit as st
 import folium
 from streamlit_folium import st_folium
-from folium.plugins import Geocoder, MarkerCluster
+from folium.plugins import Geocoder
 from newdraw import NewDraw
+from geohashlayer import GeohashCentroidCluster, GeohashLayer
 
 import geopandas as gpd
 import pandas as pd
-import re, json, io, zipfile
-from polygeohasher import polygeohasher
+from geohash_converter import jobs
+from geohash_converter.budget import cell_limit, estimate_table, suggest_precision
+from geohash_converter.cache import export_cache, geometry_fingerprint
+from geohash_converter.compact import compact_geohashes
+from geohash_converter.dissolve import dissolve_geohashes
+from geohash_converter.export import (
+    BINARY_FORMATS, binary_export, csv_chunks, delimited_chunks, export_bytes, geojson_chunks, outline_chunks,
+)
+from geohash_converter.incremental import CoverSet
+from geohash_converter.lookup import GeohashIndex
+from geohash_converter.neighbors import MAX_RING, boundary_ring, k_ring
+from geohash_converter.profiling import StageProfiler
 
 st.set_page_config(page_title="Draw → Geohash (Overlay in One Map)", layout="wide")
 
-# ---------------- Helpers ----------------
-VALID_RE = re.compile(r"^[0123456789bcdefghjkmnpqrstuvwxyz]+$")  # geohash base32 (tanpa a/i/l/o)
-
-def normalize_and_validate_series(s: pd.Series) -> pd.Series:
-    s = s.astype(str).str.strip().str.lower()
-    s = s[s.str.len().between(1, 12)]
-    s = s[s.apply(lambda x: bool(VALID_RE.match(x)))]
-    return s.dropna()
-
-def make_zip_bytes(inner_filename: str, inner_bytes: bytes) -> bytes:
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr(inner_filename, inner_bytes)
-    buf.seek(0)
-    return buf.read()
+# Instrumentasi per tahap (aktif jika env GEOHASH_PROFILE=1)
+prof = StageProfiler("Drawing_Polygon")
 
+# ---------------- Helpers ----------------
 PRECISION_COLORS = {
     1:"#1f77b4", 2:"#ff7f0e", 3:"#2ca02c", 4:"#d62728",
     5:"#9467bd", 6:"#8c564b", 7:"#e377c2", 8:"#7f7f7f",
     9:"#bcbd22", 10:"#17becf", 11:"#a55194", 12:"#393b79"
 }
 
+def drawn_geometries(fc):
+    """Geometri gambar siap di-cover: LineString/Point → buffer kecil (5 m)."""
+    gdf = gpd.GeoDataFrame.from_features(fc, crs="EPSG:4326")
+    non_poly = ~gdf.geom_type.isin(["Polygon", "MultiPolygon"])
+    if non_poly.any():
+        gdf = gdf.to_crs(3857)
+        gdf.loc[non_poly, "geometry"] = gdf.loc[non_poly, "geometry"].buffer(5)  # 5 meter
+        gdf = gdf.to_crs(4326)
+    return gdf.geometry
+
+def cover_cells(job, covers, geometries, precision, inner, compact, max_cells, ring_k=0, ring_only=False):
+    """Isi job latar: cover gambar baru/berubah, (opsional) buffer k cell, lalu (opsional) compact."""
+    # Durasi tiap fase dicatat di job dan masuk panel debug saat job selesai
+    with job.phase("cover"):
+        cells = covers.update(
+            geometries, precision, inner=inner, max_cells=max_cells,
+            progress=lambda done, total: job.report(done / total, f"Cover gambar {min(done + 1, total)}/{total}"),
+            check=job.report,
+        )
+    if ring_k:
+        job.report(1.0, f"Buffer {ring_k} cell")
+        # Batas cell dicek dari ring pertama, sebelum ring berikutnya dibuat
+        with job.phase("boundary_ring" if ring_only else "k_ring"):
+            cells = (boundary_ring if ring_only else k_ring)(cells, ring_k, max_cells=max_cells)
+    if compact:
+        job.report(1.0, "Compact cells")
+        with job.phase("compact"):
+            cells = compact_geohashes(cells)
+    return pd.Series(cells, dtype=str)
+
+def cover_job(fc):
+    """Job cover untuk gambar & pengaturan saat ini (None jika ditolak).
+
+    Jumlah cell diperkirakan dulu; di atas batas (GEOHASH_MAX_CELLS) cover
+    ditolak, dan cover yang sedang berjalan berhenti begitu melewatinya.
+    Job lama dengan input lain dibatalkan, bukan ditunggu.
+    """
+    try:
+        geometries = drawn_geometries(fc)
+        estimate = estimate_table(geometries, inner=inner_cover)
+    except Exception as e:
+        st.error(f"Gagal membaca gambar: {e}")
+        return None
+    expected = int(estimate.loc[estimate["precision"] == precision, "cells"].iloc[0])
+    suggestion = suggest_precision(estimate, max_cells)
+    with estimate_box.container():
+        if expected > max_cells:
+            st.error(
+                f"Perkiraan ~{expected:,} cell pada precision {precision} melebihi batas {max_cells:,}. "
+                + (f"Gunakan precision ≤ {suggestion}." if suggestion else "Perkecil area gambar.")
+            )
+        else:
+            st.caption(f"Perkiraan ~{expected:,} cell (batas {max_cells:,}; precision maksimum ≈ {suggestion})")
+        with st.expander("Perkiraan jumlah cell per precision", expanded=False):
+            st.dataframe(estimate, hide_index=True, use_container_width=True)
+    if expected > max_cells:
+        return None
+    key = (
+        tuple(geometry_fingerprint(g) for g in geometries), precision, inner_cover, compact_output, max_cells,
+        ring_k, ring_only,
+    )
+    return jobs.ensure(
+        st.session_state, "cover_job", key, cover_cells,
+        st.session_state["feature_covers"], list(geometries), precision, inner_cover, compact_output, max_cells,
+        ring_k, ring_only,
+    )
+
+@st.fragment(run_every=0.5)
+def job_panel(job_id):
+    """Progress job latar; halaman di-rerun penuh begitu job selesai."""
+    job = jobs.get(job_id)
+    if job is None or job.done():
+        st.rerun()
+    st.progress(job.progress, text=job.message or "Menunggu worker…")
+    if st.button("⏹️ Batalkan", key=f"cancel_{job_id}"):
+        job.cancel()
+        st.rerun()
+
+shown_panels = set()
+
+def job_cells(job):
+    """Hasil job jika selesai; selain itu tampilkan status/progress (sekali per job)."""
+    if job is None:
+        return pd.Series([], dtype=str)
+    if job.status == "done":
+        # Fase job (cover, k_ring, compact) dicatat sekali, di rerun pertama setelah selesai
+        if st.session_state.get("profiled_job") != job.id:
+            st.session_state["profiled_job"] = job.id
+            for name, seconds in job.timings.items():
+                prof.record(name, seconds)
+        return job.result
+    if job.id not in shown_panels:
+        shown_panels.add(job.id)
+        if job.status == "failed":
+            st.error(f"Gagal membuat geohash list: {job.error}")
+        elif job.status == "cancelled":
+            st.warning("Perhitungan dibatalkan.")
+            if st.button("🔁 Hitung ulang", key=f"retry_{job.id}"):
+                st.session_state.pop("cover_job", None)
+                st.rerun()
+        else:
+            job_panel(job.id)
+    return pd.Series([], dtype=str)
+
 # ---------------- Sidebar / Controls ----------------
 st.title("Draw → Geohash (Overlay in One Map)")
 
@@ -41,6 +144,10 @@ with colA:
     precision = st.slider("Precision geohash (1 = sel besar … 12 = sel kecil)", 1, 12, 6, 1)
 with colB:
     inner_cover = st.checkbox("Inner coverage (strict inside geometry)", value=False)
+# Batas keras jumlah cell per cover (env GEOHASH_MAX_CELLS); perkiraan diisi
+# di sini sebelum cover dijalankan
+max_cells = cell_limit()
+estimate_box = st.empty()
 
 with st.sidebar:
     st.header("Map Overlay Options")
@@ -50,17 +157,30 @@ with st.sidebar:
     weight = st.slider("Garis (weight)", 1, 6, 2)
     opacity = st.slider("Opacity garis", 0.1, 1.0, 1.0, step=0.1)
     fill_opacity = st.slider("Opacity fill", 0.0, 1.0, 0.25, step=0.05)
-    max_cells_on_map = st.number_input("Batas cell ditampilkan (agar ringan)", 100, 20000, 5000, 100)
+    max_cells_on_map = st.number_input("Batas cell ditampilkan (agar ringan)", 100, 500000, 50000, 1000)
     show_centroids = st.checkbox("Tampilkan centroid markers (cluster)", value=False)
 
+    st.header("Buffer cell (k-ring)")
+    # Perluas hasil cover k cell ke segala arah (8 tetangga) langsung di grid,
+    # tanpa menggambar polygon lebih besar; berlaku untuk overlay & unduhan
+    ring_k = st.number_input("Jumlah cell di sekeliling (k, 0 = tanpa buffer)", 0, MAX_RING, 0, 1)
+    ring_only = st.radio(
+        "Hasil buffer", ["Area + ring", "Ring luar saja"], index=0, horizontal=True, disabled=ring_k == 0,
+    ) == "Ring luar saja"
+
     st.header("Export")
     compress_zip = st.checkbox("Compress GeoJSON polygons ke .zip", value=True)
+    compact_output = st.checkbox("Compact output (32 sel anak lengkap → 1 sel parent)", value=False)
 
 # ---------------- Session state to keep drawings ----------------
 # Kita simpan FeatureCollection hasil gambar di session_state supaya
 # di render map berikutnya dapat ditampilkan lagi dan dihitung cell-nya.
 if "features_fc" not in st.session_state:
     st.session_state["features_fc"] = {"type": "FeatureCollection", "features": []}
+# Cell per gambar, dikunci hash geometrinya: rerun hanya meng-cover gambar
+# baru/berubah, gambar yang dihapus hanya mengurangi cell miliknya sendiri.
+if "feature_covers" not in st.session_state:
+    st.session_state["feature_covers"] = CoverSet()
 
 # ---------------- Build ONE Map (with Draw + Overlay) ----------------
 m = folium.Map(location=[-6.169689493684541, 106.82936319156342], zoom_start=12, zoom_control=True)
@@ -85,98 +205,38 @@ for tile in ['CartoDB positron', 'OpenStreetMap', 'CartoDB dark_matter']:
     folium.TileLayer(tile).add_to(m)
 
 # ------ Jika ada gambar tersimpan, hitung cells & overlay di MAP YANG SAMA ------
-cells_gdf = None
 if st.session_state["features_fc"]["features"]:
-    # Build GeoDataFrame dari gambar tersimpan
-    gdf = gpd.GeoDataFrame.from_features(st.session_state["features_fc"], crs="EPSG:4326")
-
-    # Pastikan polygon: LineString/Point → buffer kecil (5 m)
-    non_poly = ~gdf.geom_type.isin(["Polygon", "MultiPolygon"])
-    if non_poly.any():
-        gdf_poly = gdf.to_crs(3857)
-        gdf_poly.loc[non_poly, "geometry"] = gdf_poly.loc[non_poly, "geometry"].buffer(5)  # 5 meter
-        gdf_poly = gdf_poly.to_crs(4326)
-    else:
-        gdf_poly = gdf
+    # Cover berjalan sebagai job latar (worker pool bersama); halaman tetap
+    # responsif dan job bisa dibatalkan
+    flat = job_cells(cover_job(st.session_state["features_fc"]))
 
-    # Generate geohash list dari gambar tersimpan
-    try:
-        gh_df = polygeohasher.create_geohash_list(gdf_poly, precision, inner=inner_cover)
-        list_col = "geohash_list" if "geohash_list" in gh_df.columns else ("geohash" if "geohash" in gh_df.columns else None)
-        if list_col:
-            flat = gh_df[list_col].explode() if list_col == "geohash_list" else gh_df[list_col]
-            flat = normalize_and_validate_series(pd.Series(flat)).drop_duplicates().reset_index(drop=True)
-        else:
-            flat = pd.Series([], dtype=str)
-    except Exception as e:
-        st.error(f"Gagal membuat geohash list: {e}")
-        flat = pd.Series([], dtype=str)
-
-    # Jika ada geohash → buat cell polygons & overlay
+    # Jika ada geohash → overlay. Layer hanya butuh string geohash, jadi
+    # tidak ada polygon shapely yang dibuat per cell
     if not flat.empty:
-        try:
-            cells_gdf = polygeohasher.geohashes_to_geometry(pd.DataFrame({"geohash": flat}), "geohash")
-            cells_gdf = gpd.GeoDataFrame(cells_gdf, geometry=cells_gdf["geometry"], crs="EPSG:4326")
-            cells_gdf["precision"] = cells_gdf["geohash"].astype(str).str.len()
-        except Exception as e:
-            st.error(f"Gagal membuat GeoJSON polygon sel geohash: {e}")
-            cells_gdf = None
-
-        if cells_gdf is not None and not cells_gdf.empty:
-            # Limit jumlah cell yang ditampilkan di peta (unduhan tetap semua)
-            if len(cells_gdf) > max_cells_on_map:
-                st.info(f"Preview cell dibatasi {max_cells_on_map} dari {len(cells_gdf)} untuk performa. Unduhan tetap semua data.")
-                cells_preview = cells_gdf.iloc[:max_cells_on_map].copy()
-            else:
-                cells_preview = cells_gdf
-
-            # Style function
-            if color_mode == "By precision length":
-                def style_fn(feat):
-                    prec = feat["properties"].get("precision", 0)
-                    col = PRECISION_COLORS.get(int(prec), base_color)
-                    return {
-                        "color": col,
-                        "weight": weight,
-                        "opacity": opacity,
-                        "fillColor": col,
-                        "fillOpacity": fill_opacity if fill_polygon else 0.0,
-                    }
-                tooltip_fields = ["geohash", "precision"]
-            else:
-                def style_fn(_):
-                    return {
-                        "color": base_color,
-                        "weight": weight,
-                        "opacity": opacity,
-                        "fillColor": base_color,
-                        "fillOpacity": fill_opacity if fill_polygon else 0.0,
-                    }
-                tooltip_fields = ["geohash"]
-
-            # Overlay cells di MAP YANG SAMA
-            folium.GeoJson(
-                data=cells_preview.to_json(),
-                name="Geohash Cells",
-                tooltip=folium.GeoJsonTooltip(fields=tooltip_fields),
-                style_function=style_fn,
-                control=True,
-                embed=False,
-                zoom_on_click=False,
-                highlight_function=lambda _: {"weight": weight + 1},
-            ).add_to(m)
-
-            # Opsional: centroid markers (cluster)
-            if show_centroids:
-                mc = MarkerCluster(name="Geohash Centroids")
-                for _, row in cells_preview.iterrows():
-                    c = row.geometry.centroid
-                    folium.Marker(
-                        location=[c.y, c.x],
-                        tooltip=f"geohash: {row['geohash']} | precision: {row['precision']}",
-                        icon=folium.Icon(color="blue", icon="info-sign"),
-                    ).add_to(mc)
-                mc.add_to(m)
+        # Limit jumlah cell yang ditampilkan di peta (unduhan tetap semua)
+        if len(flat) > max_cells_on_map:
+            st.info(f"Preview cell dibatasi {max_cells_on_map} dari {len(flat)} untuk performa. Unduhan tetap semua data.")
+            cells_preview = flat.iloc[:max_cells_on_map]
+        else:
+            cells_preview = flat
+
+        # Overlay cells di MAP YANG SAMA
+        # Hanya string geohash yang dikirim; rectangle di-decode di browser (canvas)
+        GeohashLayer(
+            cells_preview,
+            name="Geohash Cells",
+            color=base_color,
+            colors=PRECISION_COLORS if color_mode == "By precision length" else None,
+            weight=weight,
+            opacity=opacity,
+            fill=fill_polygon,
+            fill_opacity=fill_opacity,
+        ).add_to(m)
+
+        # Opsional: centroid markers (cluster)
+        # Pusat sel dihitung sekaligus dari bounds geohash; marker dibuat di browser
+        if show_centroids:
+            GeohashCentroidCluster(cells_preview, name="Geohash Centroids").add_to(m)
 
 # Layer control
 folium.LayerControl(position='bottomleft', collapsed=False).add_to(m)
@@ -184,13 +244,15 @@ folium.LayerControl(position='bottomleft', collapsed=False).add_to(m)
 # ---------------- Render ONE MAP (draw + overlay) ----------------
 st.subheader("Gambar area & lihat overlay cells pada peta yang sama")
 st.caption("Setiap selesai menggambar, aplikasi otomatis rerun → overlay cells diperbarui di map ini.")
-st_map = st_folium(
-    m,
-    width=1200, height=700,
-    returned_objects=['last_object_clicked', 'all_drawings', 'last_active_drawing'],
-    feature_group_to_add=draw_group,
-    key="one_map"
-)
+with prof.stage("st_folium") as stage:
+    stage.output = m
+    st_map = st_folium(
+        m,
+        width=1200, height=700,
+        returned_objects=['last_clicked', 'last_object_clicked', 'all_drawings', 'last_active_drawing'],
+        feature_group_to_add=draw_group,
+        key="one_map"
+    )
 
 # ---------------- Update session_state dengan gambar terbaru ----------------
 # Normalisasi keluaran st_folium ke FeatureCollection dan simpan ke session_state
@@ -216,60 +278,127 @@ if fc_new["features"]:
 
 # ---------------- Panel hasil & unduhan ----------------
 st.subheader("Hasil & Unduhan")
+flat2 = pd.Series([], dtype=str)
 if st.session_state["features_fc"]["features"]:
-    # Hitung ulang daftar geohash dari gambar tersimpan (konsisten dengan overlay)
-    gdf_saved = gpd.GeoDataFrame.from_features(st.session_state["features_fc"], crs="EPSG:4326")
-    non_poly = ~gdf_saved.geom_type.isin(["Polygon", "MultiPolygon"])
-    if non_poly.any():
-        gdf_saved = gdf_saved.to_crs(3857)
-        gdf_saved.loc[non_poly, "geometry"] = gdf_saved.loc[non_poly, "geometry"].buffer(5)
-        gdf_saved = gdf_saved.to_crs(4326)
-
-    try:
-        gh_df2 = polygeohasher.create_geohash_list(gdf_saved, precision, inner=inner_cover)
-        list_col2 = "geohash_list" if "geohash_list" in gh_df2.columns else ("geohash" if "geohash" in gh_df2.columns else None)
-        if list_col2:
-            flat2 = gh_df2[list_col2].explode() if list_col2 == "geohash_list" else gh_df2[list_col2]
-            flat2 = normalize_and_validate_series(pd.Series(flat2)).drop_duplicates().reset_index(drop=True)
-        else:
-            flat2 = pd.Series([], dtype=str)
-    except Exception as e:
-        st.error(f"Gagal membuat geohash list: {e}")
-        flat2 = pd.Series([], dtype=str)
-
-    st.caption(f"Precision: {precision} | Total geohash unik: {len(flat2)} | Inner: {inner_cover}")
-    joined_comma = ",".join(flat2.tolist())
-    st.text_area("Salin geohash (comma-separated, no space):", joined_comma, height=120)
-
-    # TXT (comma)
-    st.download_button("⬇️ TXT (comma)", joined_comma.encode("utf-8"), "geohash_list.txt", "text/plain")
-    # JSON array
-    st.download_button("⬇️ JSON array", json.dumps(flat2.tolist()).encode("utf-8"), "geohash_list.json", "application/json")
-    # TXT (newline)
-    st.download_button("⬇️ TXT (newline)", "\n".join(flat2.tolist()).encode("utf-8"), "geohash_list_lines.txt", "text/plain")
-    # CSV
-    st.download_button("⬇️ CSV", flat2.to_frame("geohash").to_csv(index=False).encode("utf-8"), "geohash_list.csv", "text/csv")
-
-    # GeoJSON polygons (ALL), bukan yang dibatasi preview
-    try:
-        cells_all = polygeohasher.geohashes_to_geometry(pd.DataFrame({"geohash": flat2}), "geohash")
-        cells_all = gpd.GeoDataFrame(cells_all, geometry=cells_all["geometry"], crs="EPSG:4326")
-        geojson_bytes = cells_all.to_json().encode("utf-8")
-        if compress_zip:
-            st.download_button(
-                "⬇️ GeoJSON polygons (ZIP)",
-                make_zip_bytes("geohash_polygons.geojson", geojson_bytes),
-                "geohash_polygons.zip",
-                "application/zip"
-            )
-        else:
+    # Job yang sama dengan overlay jika gambar tidak berubah; gambar yang
+    # baru masuk dari peta ini membatalkan job lama dan memulai job baru
+    results_job = cover_job(st.session_state["features_fc"])
+    flat2 = job_cells(results_job)
+
+    if results_job is not None and results_job.status == "done":
+        st.caption(
+            f"Precision: {precision} | Total geohash unik: {len(flat2)} | Inner: {inner_cover} | "
+            f"Buffer k: {ring_k}{' (ring saja)' if ring_k and ring_only else ''} | Compact: {compact_output}"
+        )
+        joined_comma = ",".join(flat2.tolist())
+        st.text_area("Salin geohash (comma-separated, no space):", joined_comma, height=120)
+
+        # TXT (comma)
+        st.download_button("⬇️ TXT (comma)", joined_comma.encode("utf-8"), "geohash_list.txt", "text/plain")
+        # JSON array
+        st.download_button("⬇️ JSON array", export_bytes(delimited_chunks(flat2, json_array=True)), "geohash_list.json", "application/json")
+        # TXT (newline)
+        st.download_button("⬇️ TXT (newline)", export_bytes(delimited_chunks(flat2, "\n")), "geohash_list_lines.txt", "text/plain")
+        # CSV
+        with prof.stage("export_csv") as stage:
+            csv_bytes = stage.output = export_bytes(csv_chunks(flat2.to_frame("geohash"), index=False))
+        st.download_button("⬇️ CSV", csv_bytes, "geohash_list.csv", "text/csv")
+
+        # GeoJSON polygons (ALL), bukan yang dibatasi preview
+        # Ditulis per chunk langsung dari bounds geohash (tanpa to_json penuh di memori)
+        try:
+            cells_all = flat2.to_frame("geohash")
+            if compress_zip:
+                with prof.stage("export_geojson_zip") as stage:
+                    geojson_bytes = stage.output = export_bytes(geojson_chunks(cells_all), zip_member="geohash_polygons.geojson")
+                st.download_button(
+                    "⬇️ GeoJSON polygons (ZIP)",
+                    geojson_bytes,
+                    "geohash_polygons.zip",
+                    "application/zip"
+                )
+            else:
+                with prof.stage("export_geojson") as stage:
+                    geojson_bytes = stage.output = export_bytes(geojson_chunks(cells_all))
+                st.download_button(
+                    "⬇️ GeoJSON polygons",
+                    geojson_bytes,
+                    "geohash_polygons.geojson",
+                    "application/geo+json"
+                )
+        except Exception as e:
+            st.error(f"Gagal membuat GeoJSON polygons: {e}")
+
+        # Outline gabungan cell (dissolve di grid geohash, tanpa union polygon);
+        # dibuat hanya jika diminta, lalu disimpan per job
+        if st.session_state.get("outline_job") == results_job.id:
+            with prof.stage("export_outline") as stage:
+                outline_bytes = stage.output = export_cache.get_or_compute(
+                    ("outline", results_job.id),
+                    lambda: export_bytes(outline_chunks(dissolve_geohashes(flat2.tolist()))),
+                )
+            st.download_button("⬇️ GeoJSON outline (dissolve)", outline_bytes, "geohash_outline.geojson", "application/geo+json")
+        elif st.button("🧩 Buat outline gabungan (dissolve)"):
+            st.session_state["outline_job"] = results_job.id
+            st.rerun()
+
+        # Format biner kolumnar (GeoParquet / FlatGeobuf / Arrow IPC)
+        colF, colI = st.columns(2)
+        with colF:
+            binary_fmt = st.selectbox("Format biner", list(BINARY_FORMATS), index=0)
+        with colI:
+            with_int = st.checkbox("Tambah kolom geohash integer (int64)", value=True)
+        try:
+            ext, mime = BINARY_FORMATS[binary_fmt]
+            with prof.stage(f"export_{binary_fmt}") as stage:
+                # Dibuat sekali per job & format; rerun berikutnya memakai bytes yang tersimpan
+                binary_bytes = stage.output = export_cache.get_or_compute(
+                    ("binary", results_job.id, binary_fmt, with_int),
+                    lambda: binary_export(flat2.to_frame("geohash"), binary_fmt, with_int=with_int),
+                )
             st.download_button(
-                "⬇️ GeoJSON polygons",
-                geojson_bytes,
-                "geohash_polygons.geojson",
-                "application/geo+json"
+                f"⬇️ {binary_fmt}",
+                binary_bytes,
+                "geohash_polygons" + ext,
+                mime
             )
-    except Exception as e:
-        st.error(f"Gagal membuat GeoJSON polygons: {e}")
+        except Exception as e:
+            st.error(f"Gagal membuat {binary_fmt}: {e}")
 else:
     st.info("Belum ada gambar untuk dihitung/diunduh.")
+
+# ---------------- Inspect klik (panel samping) ----------------
+# Indeks int64 terurut atas SEMUA cell (bukan hanya preview di peta):
+# titik klik di-encode lalu dicari dengan binary search per precision.
+def click_index(job, cells):
+    """Indeks cell hasil job; dibuat sekali per job, bukan di setiap klik."""
+    job_id, index = st.session_state.get("click_index", (None, None))
+    if job_id != job.id:
+        index = GeohashIndex(cells)
+        st.session_state["click_index"] = (job.id, index)
+    return index
+
+clicked = None
+if isinstance(st_map, dict):
+    clicked = st_map.get("last_clicked") or st_map.get("last_object_clicked")
+with st.sidebar:
+    st.header("Inspect klik")
+    if clicked and not flat2.empty:
+        with prof.stage("lookup_click") as stage:
+            lookup = stage.output = click_index(results_job, flat2).lookup(clicked["lat"], clicked["lng"])
+        hits = lookup.loc[lookup["in_set"], "geohash"].tolist()
+        st.caption(f"Titik: {clicked['lat']:.6f}, {clicked['lng']:.6f}")
+        if hits:
+            st.success(f"Di dalam cell: {', '.join(hits)}")
+        else:
+            st.info("Titik tidak berada di cell mana pun dari hasil.")
+        st.dataframe(lookup[lookup["cells_within"] > 0], hide_index=True, use_container_width=True)
+    else:
+        st.caption("Klik peta untuk melihat cell (dan parent/child) yang memuat titik tersebut.")
+
+# ---------------- Debug: waktu & memori per tahap ----------------
+if prof.enabled:
+    with st.expander("🐞 Debug: waktu, memori & ukuran output per tahap", expanded=False):
+        st.dataframe(prof.frame(), use_container_width=True)
+        st.caption(f"Rerun {prof.rerun_id} — dicatat ke {prof.log_path}")
+    prof.flush()
@@ -1,18 +1,30 @@
 import pandas as pd
-import geopandas as gpd
 import streamlit as st
+from geohash_converter.coordinates import coordinate_table
+from geohash_converter.export import export_bytes, frames_csv_chunks
+from geohash_converter.reader import read_feature_batches
 
 try:
-    col_name = st.text_input('Please input Polygon Arena Name column that want to be converted as Coordinate Separated Comma')
-    uploaded_files = st.file_uploader("Choose a Geojson file And Please dissolve the Files into single polygon/attribute, Other than that will cause major ERROR!!", accept_multiple_files=False)
-    gdf = gpd.read_file(uploaded_files)
-    xy = gdf.get_coordinates()
-    df_area = gdf[col_name]
-    merge_df = pd.concat([df_area, xy], axis=1, join='outer')
-    merge_df['concat'] = merge_df['y'].astype(str) + ',' + merge_df['x'].astype(str)
-    groupby = merge_df.groupby(col_name).agg({'concat':','.join}).reset_index().reindex(columns=merge_df.columns).drop(['x','y'], axis=1)
-    st.dataframe(groupby)
-    csv=groupby.to_csv()
+    col_name = st.text_input('Please input Polygon Arena Name column that want to be converted as Coordinate Separated Comma (optional)')
+    uploaded_files = st.file_uploader("Choose a Geojson file (any number of features; every part and ring gets its own row)", accept_multiple_files=False)
+    full_precision = st.checkbox('Keep full coordinate precision', value=False)
+    decimals = None if full_precision else int(st.number_input('Decimal places', min_value=0, max_value=15, value=6))
+
+    # Features are read in batches and every batch is written to the CSV as it
+    # is formatted; only the first rows are kept for the preview.
+    uploaded_files.seek(0)
+    preview = []
+    def coordinate_tables():
+        start = 0
+        for gdf in read_feature_batches(uploaded_files):
+            table = coordinate_table(gdf, col_name or None, decimals, start=start)
+            start += len(gdf)
+            if not preview:
+                preview.append(table.head(1000))
+            yield table
+
+    csv = export_bytes(frames_csv_chunks(coordinate_tables(), index=False))
+    st.dataframe(preview[0] if preview else pd.DataFrame())
     save = st.text_input('Write you files name here and press ENTER!!')
     st.download_button(
         label="Download data as CSV",
@@ -22,5 +34,3 @@ try:
     )
 except (TypeError, NameError, AttributeError):
   pass
-
-
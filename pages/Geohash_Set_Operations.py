@@ -0,0 +1,167 @@
+import folium
+import numpy as np
+import pandas as pd
+import streamlit as st
+from geohashlayer import GeohashLayer
+from geohash_converter.cache import export_cache
+from geohash_converter.decode import decode_bounds, int_to_geohashes
+from geohash_converter.export import BINARY_FORMATS, binary_export, delimited_chunks, export_bytes, geojson_chunks
+from geohash_converter.profiling import StageProfiler
+from geohash_converter.setops import OPERATIONS
+from geohash_converter.validate import tokenize_geohash_keys
+from streamlit_folium import st_folium
+
+st.set_page_config(page_title="Geohash Set Operations", layout="wide")
+
+# Instrumentasi per tahap (aktif jika env GEOHASH_PROFILE=1)
+prof = StageProfiler("Geohash_Set_Operations")
+
+CENTER_FALLBACK = [-6.175337169759785, 106.82713616185086]
+# Palet warna diskrit untuk precision 1..12
+PRECISION_COLORS = {
+    1:"#1f77b4", 2:"#ff7f0e", 3:"#2ca02c", 4:"#d62728",
+    5:"#9467bd", 6:"#8c564b", 7:"#e377c2", 8:"#7f7f7f",
+    9:"#bcbd22", 10:"#17becf", 11:"#a55194", 12:"#393b79"
+}
+# Label → (nama operasi di setops.OPERATIONS, tukar A dan B)
+CHOICES = {
+    "Union (A ∪ B)": ("union", False),
+    "Intersection (A ∩ B)": ("intersection", False),
+    "Difference (A − B)": ("difference", False),
+    "Difference (B − A)": ("difference", True),
+}
+
+# -------------------- UI --------------------
+st.title("Geohash Set Operations")
+st.caption(
+    "Bandingkan dua daftar geohash (boleh campur precision). Parent dianggap "
+    "mencakup semua child-nya, mis. `qqgu` ∩ `qqguw` = `qqguw`."
+)
+
+colA, colB = st.columns(2)
+with colA:
+    text_a = st.text_area("Daftar A (mis. coverage bulan lalu)", value="qqgu", height=180)
+with colB:
+    text_b = st.text_area("Daftar B (mis. coverage bulan ini)", value="qqguw,qqguy,qqgv", height=180)
+operation = st.radio("Operasi", list(CHOICES), index=0, horizontal=True)
+
+with st.sidebar:
+    st.header("Pengaturan Tampilan")
+    color_mode = st.selectbox("Warna", options=["Single color", "By precision length"], index=1)
+    base_color = st.color_picker("Warna default (untuk Single color)", "#d62728")
+    fill_polygon = st.checkbox("Isi polygon (fill)", value=True)
+    weight = st.slider("Garis (weight)", 1, 6, 2)
+    fill_opacity = st.slider("Opacity fill", 0.0, 1.0, 0.25, step=0.05)
+    max_polys = st.number_input(
+        "Batas render polygon (untuk performa di peta)", min_value=100, max_value=500000, value=50000, step=1000
+    )
+    show_inputs = st.checkbox("Tampilkan juga layer A dan B", value=True)
+
+    st.markdown("---")
+    st.subheader("Export")
+    compress_zip = st.checkbox("Compress ke .zip saat download", value=True)
+
+# -------------------- Set operation --------------------
+# Tokenizer yang sama dengan halaman visualisasi, langsung ke kunci int64
+# terurut; operasi berjalan di atas range integer (O(n log n)).
+with prof.stage("tokenize_geohash_keys") as stage:
+    keys_a = tokenize_geohash_keys(text_a)
+    keys_b = stage.output = tokenize_geohash_keys(text_b)
+with prof.stage("set_operation") as stage:
+    name, swap = CHOICES[operation]
+    result = stage.output = OPERATIONS[name](*((keys_b, keys_a) if swap else (keys_a, keys_b)))
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Geohash valid & unik di A", len(keys_a))
+with col2:
+    st.metric("Geohash valid & unik di B", len(keys_b))
+with col3:
+    st.metric(f"Hasil: {operation}", len(result))
+
+if not result:
+    st.info("Hasil operasi kosong.")
+
+# -------------------- Map --------------------
+# Pusat peta dari bounds hasil (decode vektor), tanpa unary_union
+shown = result if result else int_to_geohashes(np.concatenate((keys_a, keys_b))).tolist()
+if shown:
+    minx, miny, maxx, maxy = decode_bounds(shown)
+    center = [float(miny.min() + maxy.max()) / 2, float(minx.min() + maxx.max()) / 2]
+else:
+    center = CENTER_FALLBACK
+
+m = folium.Map(location=center, zoom_start=12)
+if show_inputs:
+    for name, keys, color in (("A", keys_a, "#1f77b4"), ("B", keys_b, "#ff7f0e")):
+        if keys.size:
+            GeohashLayer(
+                int_to_geohashes(keys[:max_polys]), name=f"Daftar {name}", color=color,
+                weight=1, opacity=0.6, fill=False, show=False,
+            ).add_to(m)
+if result:
+    if len(result) > max_polys:
+        st.info(f"Render di peta dibatasi {max_polys} dari {len(result)} polygon demi performa. "
+                f"Namun file yang diunduh tetap berisi **SEMUA** polygon.")
+    GeohashLayer(
+        result[:max_polys],
+        name="Hasil",
+        color=base_color,
+        colors=PRECISION_COLORS if color_mode == "By precision length" else None,
+        weight=weight,
+        fill=fill_polygon,
+        fill_opacity=fill_opacity,
+    ).add_to(m)
+folium.LayerControl(collapsed=False).add_to(m)
+
+with prof.stage("st_folium") as stage:
+    stage.output = m
+    st_folium(m, center=center, width=1200, height=700)
+
+# -------------------- DOWNLOADS --------------------
+if result:
+    cells = pd.DataFrame({"geohash": result})
+    cells["precision"] = cells["geohash"].str.len()
+    st.subheader("Download Hasil")
+    col1, col2 = st.columns(2)
+    with col1:
+        joined = ",".join(result)
+        st.download_button("⬇️ TXT (comma)", joined.encode("utf-8"), "geohash_result.txt", "text/plain")
+        st.download_button(
+            "⬇️ TXT (newline)", export_bytes(delimited_chunks(cells["geohash"], "\n")), "geohash_result_lines.txt", "text/plain"
+        )
+    with col2:
+        if compress_zip:
+            with prof.stage("export_polygons_zip") as stage:
+                zip_bytes = stage.output = export_bytes(geojson_chunks(cells), zip_member="geohash_result.geojson")
+            st.download_button("⬇️ Polygons (ZIP)", zip_bytes, "geohash_result.zip", "application/zip")
+        else:
+            with prof.stage("export_polygons") as stage:
+                polygons_bytes = stage.output = export_bytes(geojson_chunks(cells))
+            st.download_button("⬇️ Polygons (GeoJSON)", polygons_bytes, "geohash_result.geojson", "application/geo+json")
+
+    colF, colI = st.columns(2)
+    with colF:
+        binary_fmt = st.selectbox("Format biner", list(BINARY_FORMATS), index=0)
+    with colI:
+        with_int = st.checkbox("Tambah kolom geohash integer (int64)", value=True)
+    try:
+        ext, mime = BINARY_FORMATS[binary_fmt]
+        with prof.stage(f"export_{binary_fmt}") as stage:
+            # Dibuat sekali per hasil & format; rerun berikutnya memakai bytes yang tersimpan
+            binary_bytes = stage.output = export_cache.get_or_compute(
+                ("binary", joined, binary_fmt, with_int), lambda: binary_export(cells, binary_fmt, with_int=with_int)
+            )
+        st.download_button(f"⬇️ Polygons ({binary_fmt})", binary_bytes, "geohash_result" + ext, mime)
+    except Exception as e:
+        st.error(f"Gagal membuat {binary_fmt}: {e}")
+
+    with st.expander("Lihat/Salin hasil (dipisah koma)"):
+        st.code(joined, language="text")
+
+# -------------------- Debug: waktu & memori per tahap --------------------
+if prof.enabled:
+    with st.expander("🐞 Debug: waktu, memori & ukuran output per tahap", expanded=False):
+        st.dataframe(prof.frame(), use_container_width=True)
+        st.caption(f"Rerun {prof.rerun_id} — dicatat ke {prof.log_path}")
+    prof.flush()
@@ -1,42 +1,25 @@
-import re
-import io
-import zipfile
 import folium
 import pandas as pd
 import geopandas as gpd
 import streamlit as st
-from folium.plugins import MarkerCluster
-from polygeohasher import polygeohasher
+from geohashlayer import GeoJsonOutline, GeohashCentroidCluster, GeohashLayer
+from geohash_converter.budget import CellBudgetExceeded, cell_limit
+from geohash_converter.cache import export_cache
+from geohash_converter.compact import expand_geohashes
+from geohash_converter.decode import decode_bounds
+from geohash_converter.dissolve import dissolve_geohashes
+from geohash_converter.export import BINARY_FORMATS, binary_export, export_bytes, geojson_chunks, outline_chunks
+from geohash_converter.neighbors import MAX_RING, boundary_ring, k_ring
+from geohash_converter.profiling import StageProfiler
+from geohash_converter.validate import tokenize_geohashes
 from streamlit_folium import st_folium
 
 st.set_page_config(page_title="Geohash Visualizer", layout="wide")
 
-CENTER_FALLBACK = [-6.175337169759785, 106.82713616185086]
-VALID_RE = re.compile(r"^[0123456789bcdefghjkmnpqrstuvwxyz]+$")  # alfabet geohash (tanpa a/i/l/o)
-
-# -------------------- Helpers --------------------
-def clean_and_tokenize(text: str):
-    """
-    - Lowercase
-    - Semua whitespace / ';' -> koma
-    - Trim spasi di sekitar koma
-    - Split koma -> list
-    - Validasi alfabet geohash, panjang 1..12
-    - Dedup (preserve order)
-    """
-    if not text:
-        return []
-    s = text.lower()
-    s = re.sub(r"[;\s]+", ",", s)      # semua whitespace/; -> koma
-    s = re.sub(r"\s*,\s*", ",", s)     # trim spasi di sekitar koma
-    parts = s.split(",")
-    out, seen = [], set()
-    for p in parts:
-        if p and VALID_RE.match(p) and (1 <= len(p) <= 12) and p not in seen:
-            seen.add(p)
-            out.append(p)
-    return out
+# Instrumentasi per tahap (aktif jika env GEOHASH_PROFILE=1)
+prof = StageProfiler("Geohash_Visualization_by_Copying")
 
+CENTER_FALLBACK = [-6.175337169759785, 106.82713616185086]
 # Palet warna diskrit untuk precision 1..12
 PRECISION_COLORS = {
     1:"#1f77b4", 2:"#ff7f0e", 3:"#2ca02c", 4:"#d62728",
@@ -75,16 +58,47 @@ with st.sidebar:
     opacity = st.slider("Opacity garis", 0.1, 1.0, 1.0, step=0.1)
     fill_opacity = st.slider("Opacity fill", 0.0, 1.0, 0.25, step=0.05)
     max_polys = st.number_input(
-        "Batas render polygon (untuk performa di peta)", min_value=100, max_value=20000, value=5000, step=100
+        "Batas render polygon (untuk performa di peta)", min_value=100, max_value=500000, value=50000, step=1000
     )
 
+    expand_to = st.number_input(
+        "Expand ke precision (0 = tidak, untuk input hasil compact)", min_value=0, max_value=12, value=0, step=1
+    )
+
+    ring_k = st.number_input(
+        "Buffer k cell di sekeliling (k-ring, 0 = tidak)", min_value=0, max_value=MAX_RING, value=0, step=1
+    )
+    ring_only = st.checkbox("Hanya ring luar (tanpa cell input)", value=False, disabled=ring_k == 0)
+    show_outline = st.checkbox("Tampilkan outline gabungan (dissolve)", value=False)
+
     st.markdown("---")
     st.subheader("Export")
     compress_zip = st.checkbox("Compress ke .zip saat download", value=True)
     # Ekspor selalu semua polygon (bukan subset), sesuai permintaan
 
 # -------------------- Preprocess --------------------
-geohashes = clean_and_tokenize(text)
+# Lowercase, pisah di whitespace/','/';', validasi alfabet & panjang 1..12,
+# dedup (urutan dipertahankan) — satu pass vektor atas teks.
+with prof.stage("tokenize_geohashes") as stage:
+    geohashes = stage.output = tokenize_geohashes(text)
+if expand_to:
+    try:
+        with prof.stage("expand_geohashes") as stage:
+            geohashes = stage.output = expand_geohashes(geohashes, int(expand_to), max_cells=cell_limit())
+    except CellBudgetExceeded as e:
+        st.error(f"Expand dibatalkan: {e}. Pilih precision lebih kasar atau perkecil daftar geohash.")
+    except ValueError as e:
+        st.error(f"Gagal expand geohash: {e}")
+if ring_k and geohashes:
+    # Tetangga dihitung di grid integer (wrap antimeridian & kutub); hasilnya
+    # menggantikan input untuk peta dan semua unduhan
+    try:
+        with prof.stage("k_ring") as stage:
+            geohashes = stage.output = (boundary_ring if ring_only else k_ring)(
+                geohashes, int(ring_k), max_cells=cell_limit()
+            )
+    except CellBudgetExceeded as e:
+        st.error(f"Buffer k-ring dibatalkan: {e}. Perkecil k atau daftar geohash.")
 
 colA, colB, colC = st.columns(3)
 with colA:
@@ -101,130 +115,96 @@ if not geohashes:
     st_folium(m, width=1200, height=800)
     st.stop()
 
-df = pd.DataFrame({"geohash": geohashes})
-
-# -------------------- Geometries --------------------
-try:
-    geohash_df_list = polygeohasher.geohashes_to_geometry(df, "geohash")
-except Exception as e:
-    st.error(f"Gagal mengonversi geohash ke polygon: {e}")
-    m = folium.Map(location=CENTER_FALLBACK, zoom_start=12)
-    st_folium(m, width=1200, height=800)
-    st.stop()
-
-gdf = gpd.GeoDataFrame(geohash_df_list, geometry=geohash_df_list["geometry"], crs="EPSG:4326")
-if gdf.empty or gdf.geometry.is_empty.all():
-    st.error("Geometry kosong setelah konversi.")
-    m = folium.Map(location=CENTER_FALLBACK, zoom_start=12)
-    st_folium(m, width=1200, height=800)
-    st.stop()
+# -------------------- Cells --------------------
+# Peta dan unduhan cukup dari string geohash (rectangle di-decode di browser
+# dan per chunk saat ekspor), jadi tidak ada polygon shapely per cell.
+# Bounds di-decode sekali saja, untuk pusat peta.
+cells = pd.DataFrame({"geohash": geohashes})
+cells["precision"] = cells["geohash"].str.len()
+# Juga kunci cache unduhan: hasil yang sama dipakai ulang di rerun berikutnya
+clean_joined = ",".join(geohashes)
+with prof.stage("decode_bounds") as stage:
+    minx, miny, maxx, maxy = stage.output = decode_bounds(cells["geohash"].to_numpy())
 
-# Tambah kolom precision (panjang geohash)
-gdf["precision"] = gdf["geohash"].astype(str).str.len()
+# Center ke tengah bounds hasil decode (vektor), tanpa union polygon
+center = [float(miny.min() + maxy.max()) / 2, float(minx.min() + maxx.max()) / 2]
 
-# Center ke centroid union
-try:
-    centroid = gdf.unary_union.centroid
-    center = [float(centroid.y), float(centroid.x)]
-except Exception:
-    center = CENTER_FALLBACK
+# Outline gabungan semua cell, di-dissolve langsung di grid geohash. Hanya
+# dibuat bila layer-nya ditampilkan atau unduhannya diminta, dan disimpan
+# per himpunan cell agar rerun berikutnya tidak men-dissolve ulang.
+outline = None
+if show_outline or st.session_state.get("outline_for") == clean_joined:
+    with prof.stage("dissolve_geohashes") as stage:
+        outline = stage.output = export_cache.get_or_compute(
+            ("outline", clean_joined), lambda: dissolve_geohashes(geohashes)
+        )
 
 # -------------------- Map --------------------
 m = folium.Map(location=center, zoom_start=14)
 
 if vis_mode == "Polygons":
     # Demi performa tampilan peta, batasi render. (Ekspor tetap semua polygon.)
-    if len(gdf) > max_polys:
-        st.info(f"Render di peta dibatasi {max_polys} dari {len(gdf)} polygon demi performa. "
+    if len(cells) > max_polys:
+        st.info(f"Render di peta dibatasi {max_polys} dari {len(cells)} polygon demi performa. "
                 f"Namun file yang diunduh tetap berisi **SEMUA** polygon.")
-        gdf_render = gdf.iloc[:max_polys].copy()
-    else:
-        gdf_render = gdf
-
-    # Style function
-    if color_mode == "By precision length":
-        def style_fn(feat):
-            prec = feat["properties"].get("precision", 0)
-            col = PRECISION_COLORS.get(int(prec), base_color)
-            return {
-                "color": col,
-                "weight": weight,
-                "opacity": opacity,
-                "fillColor": col,
-                "fillOpacity": fill_opacity if fill_polygon else 0.0,
-            }
-        tooltip_fields = ["geohash", "precision"]
+        cells_render = cells.iloc[:max_polys]
     else:
-        def style_fn(_):
-            return {
-                "color": base_color,
-                "weight": weight,
-                "opacity": opacity,
-                "fillColor": base_color,
-                "fillOpacity": fill_opacity if fill_polygon else 0.0,
-            }
-        tooltip_fields = ["geohash"]
+        cells_render = cells
 
-    folium.GeoJson(
-        data=gdf_render.to_json(),
+    # Hanya string geohash yang dikirim ke browser; rectangle di-decode di JS (canvas)
+    GeohashLayer(
+        cells_render["geohash"],
         name="geohash-polygons",
-        tooltip=folium.GeoJsonTooltip(fields=tooltip_fields),
-        style_function=style_fn,
-        control=True,
-        embed=False,
-        zoom_on_click=False,
-        highlight_function=lambda _: {"weight": weight + 1},
+        color=base_color,
+        colors=PRECISION_COLORS if color_mode == "By precision length" else None,
+        weight=weight,
+        opacity=opacity,
+        fill=fill_polygon,
+        fill_opacity=fill_opacity,
     ).add_to(m)
 
 else:
-    # Centroid markers + cluster
-    mc = MarkerCluster(name="geohash-centroids", show=True)
-    for _, row in gdf.iterrows():
-        c = row.geometry.centroid
-        folium.Marker(
-            location=[c.y, c.x],
-            tooltip=f"geohash: {row['geohash']} | precision: {row['precision']}",
-            icon=folium.Icon(color="blue", icon="info-sign"),
-        ).add_to(mc)
-    mc.add_to(m)
+    # Centroid markers + cluster: pusat sel dihitung sekaligus dari bounds
+    # geohash dan dikirim sebagai satu array; marker dibuat di browser
+    with prof.stage("centroid_markers") as stage:
+        GeohashCentroidCluster(cells["geohash"], name="geohash-centroids", show=True).add_to(m)
+
+if show_outline and len(outline):
+    GeoJsonOutline(
+        gpd.GeoSeries(outline, crs="EPSG:4326"), name="outline (dissolve)",
+        color=base_color, weight=weight + 1, opacity=opacity, fill=False,
+    ).add_to(m)
 
 folium.LayerControl(collapsed=False).add_to(m)
 
-st_folium(
-    m,
-    center=center,
-    width=1200,
-    height=800,
-)
+with prof.stage("st_folium") as stage:
+    stage.output = m
+    st_folium(
+        m,
+        center=center,
+        width=1200,
+        height=800,
+    )
 
 # -------------------- DOWNLOADS --------------------
 # 1) GeoJSON POLYGONS (SELALU SEMUA POLYGON)
-#    Terlepas dari subset yg dirender di peta, ekspor pakai seluruh gdf.
-polygons_geojson_bytes = gdf.to_json().encode("utf-8")
+#    Terlepas dari subset yg dirender di peta, ekspor pakai seluruh cell.
+#    Ditulis per chunk langsung dari bounds geohash, tanpa to_json() penuh.
 polygons_fname_json = "geohash_polygons_ALL.geojson"
 polygons_fname_zip = "geohash_polygons_ALL.zip"
 
 # 2) GeoJSON CENTROIDS (selalu semua titik centroid dari semua polygon)
-cent = gdf.copy()
-cent["geometry"] = cent.geometry.centroid
-centroids_geojson_bytes = cent[["geohash", "precision", "geometry"]].to_json().encode("utf-8")
 centroids_fname_json = "geohash_centroids_ALL.geojson"
 centroids_fname_zip = "geohash_centroids_ALL.zip"
 
-def make_zip_bytes(inner_filename: str, inner_bytes: bytes) -> bytes:
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr(inner_filename, inner_bytes)
-    buf.seek(0)
-    return buf.read()
-
 st.subheader("Download Data")
 col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("**Polygons (ALL)**")
     if compress_zip:
-        zip_bytes = make_zip_bytes(polygons_fname_json, polygons_geojson_bytes)
+        with prof.stage("export_polygons_zip") as stage:
+            zip_bytes = stage.output = export_bytes(geojson_chunks(cells), zip_member=polygons_fname_json)
         st.download_button(
             "⬇️ Download Polygons (ZIP)",
             data=zip_bytes,
@@ -233,9 +213,11 @@ with col1:
             help="Semua polygon disimpan sebagai GeoJSON di dalam file ZIP."
         )
     else:
+        with prof.stage("export_polygons") as stage:
+            polygons_bytes = stage.output = export_bytes(geojson_chunks(cells))
         st.download_button(
             "⬇️ Download Polygons (GeoJSON)",
-            data=polygons_geojson_bytes,
+            data=polygons_bytes,
             file_name=polygons_fname_json,
             mime="application/geo+json",
             help="Semua polygon sebagai GeoJSON."
@@ -244,7 +226,8 @@ with col1:
 with col2:
     st.markdown("**Centroids (ALL)**")
     if compress_zip:
-        zip_bytes_c = make_zip_bytes(centroids_fname_json, centroids_geojson_bytes)
+        with prof.stage("export_centroids_zip") as stage:
+            zip_bytes_c = stage.output = export_bytes(geojson_chunks(cells, geometry="centroid"), zip_member=centroids_fname_json)
         st.download_button(
             "⬇️ Download Centroids (ZIP)",
             data=zip_bytes_c,
@@ -253,16 +236,74 @@ with col2:
             help="Semua centroid disimpan sebagai GeoJSON di dalam file ZIP."
         )
     else:
+        with prof.stage("export_centroids") as stage:
+            centroids_bytes = stage.output = export_bytes(geojson_chunks(cells, geometry="centroid"))
         st.download_button(
             "⬇️ Download Centroids (GeoJSON)",
-            data=centroids_geojson_bytes,
+            data=centroids_bytes,
             file_name=centroids_fname_json,
             mime="application/geo+json",
             help="Semua centroid sebagai GeoJSON."
         )
 
+# 3) Outline gabungan (dissolve): satu polygon per area yang tersambung
+outline_fname_json = "geohash_outline.geojson"
+if outline is None:
+    st.markdown("**Outline gabungan**")
+    if st.button("🧩 Buat outline gabungan (dissolve)"):
+        st.session_state["outline_for"] = clean_joined
+        st.rerun()
+elif compress_zip:
+    st.markdown(f"**Outline gabungan ({len(outline)} polygon)**")
+    with prof.stage("export_outline_zip") as stage:
+        outline_bytes = stage.output = export_cache.get_or_compute(
+            ("outline_zip", clean_joined), lambda: export_bytes(outline_chunks(outline), zip_member=outline_fname_json)
+        )
+    st.download_button(
+        "⬇️ Download Outline (ZIP)",
+        data=outline_bytes,
+        file_name="geohash_outline.zip",
+        mime="application/zip",
+        help="Batas luar (dan lubang) gabungan semua cell, sebagai GeoJSON di dalam file ZIP."
+    )
+else:
+    st.markdown(f"**Outline gabungan ({len(outline)} polygon)**")
+    with prof.stage("export_outline") as stage:
+        outline_bytes = stage.output = export_cache.get_or_compute(
+            ("outline_geojson", clean_joined), lambda: export_bytes(outline_chunks(outline))
+        )
+    st.download_button(
+        "⬇️ Download Outline (GeoJSON)",
+        data=outline_bytes,
+        file_name=outline_fname_json,
+        mime="application/geo+json",
+        help="Batas luar (dan lubang) gabungan semua cell sebagai GeoJSON."
+    )
+
+# 4) Format biner kolumnar (GeoParquet / FlatGeobuf / Arrow IPC), SEMUA polygon
+st.markdown("**Format biner (ALL)**")
+colF, colI = st.columns(2)
+with colF:
+    binary_fmt = st.selectbox("Format", list(BINARY_FORMATS), index=0)
+with colI:
+    with_int = st.checkbox("Tambah kolom geohash integer (int64)", value=True)
+try:
+    ext, mime = BINARY_FORMATS[binary_fmt]
+    with prof.stage(f"export_{binary_fmt}") as stage:
+        binary_bytes = stage.output = export_cache.get_or_compute(
+            ("binary", clean_joined, binary_fmt, with_int), lambda: binary_export(cells, binary_fmt, with_int=with_int)
+        )
+    st.download_button(
+        f"⬇️ Download Polygons ({binary_fmt})",
+        data=binary_bytes,
+        file_name="geohash_polygons_ALL" + ext,
+        mime=mime,
+        help="Semua polygon dalam format kolumnar; kolom integer bisa dipakai untuk join/range query."
+    )
+except Exception as e:
+    st.error(f"Gagal membuat {binary_fmt}: {e}")
+
 # -------------------- Utilitas: geohash bersih --------------------
-clean_joined = ",".join(geohashes)
 with st.expander("Lihat/Salin geohash yang sudah dibersihkan (tanpa spasi, dipisah koma)"):
     st.code(clean_joined, language="text")
     st.download_button(
@@ -271,3 +312,10 @@ with st.expander("Lihat/Salin geohash yang sudah dibersihkan (tanpa spasi, dipis
         file_name="geohash_bersih.txt",
         mime="text/plain",
     )
+
+# -------------------- Debug: waktu & memori per tahap --------------------
+if prof.enabled:
+    with st.expander("🐞 Debug: waktu, memori & ukuran output per tahap", expanded=False):
+        st.dataframe(prof.frame(), use_container_width=True)
+        st.caption(f"Rerun {prof.rerun_id} — dicatat ke {prof.log_path}")
+    prof.flush()